@@ -1,4 +1,7 @@
+import copy
+import functools
 import os
+import shutil
 import sys
 import re
 from typing import Dict, Any, Optional
@@ -12,9 +15,35 @@ except ImportError:
     except ImportError:
         toml = None
 
+# Prefer rtoml (Rust parser) when installed; fall back to tomllib/tomli
+try:
+    import rtoml
+
+    def toml_load(f) -> Dict[str, Any]:
+        """Parse a TOML file opened in binary mode."""
+        return rtoml.loads(f.read().decode("utf-8"))
+except ImportError:
+    toml_load = toml.load if toml else None
+
+
+def load_tomlkit():
+    """Optional style-preserving TOML editor for writing user config.
+
+    Imported on first use: only `sensei use`/`init` write config, so other
+    commands don't pay for the import.
+    """
+    try:
+        import tomlkit
+    except ImportError:
+        return None
+    return tomlkit
+
+
 DEFAULT_CONFIG = {
     "core": {
-        "default_provider": "gemini"
+        "default_provider": "gemini",
+        "compact_diff": False,
+        "fast_path": True
     },
     "prompts": {
         "universal": """You are a professional git commit message generator.
@@ -58,8 +87,14 @@ RULES:
 }
 
 class ConfigManager:
+    # Fallback patterns for editing the user config as text (no tomlkit)
+    _DEFAULT_LINE_RE = re.compile(r'^default_provider\s*=', re.MULTILINE)
+    _DEFAULT_SUB_RE = re.compile(r'^default_provider\s*=\s*["\']?\w+["\']?', re.MULTILINE)
+    _CORE_RE = re.compile(r'(\[core\])')
+
     def __init__(self):
-        self.config = DEFAULT_CONFIG
+        # Own copy, so merging user config never mutates the module-level defaults
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
         self.load_config()
 
     def load_config(self):
@@ -71,27 +106,33 @@ class ConfigManager:
             os.path.expanduser("~/.sensei.toml"),                      # User config (highest priority)
         ]
 
-        if not toml:
+        if not toml_load:
             # Fallback if no TOML parser installed
             # We don't warn here to avoid spamming stdout, but we stick to defaults
             return
 
         for path in paths:
-            if os.path.exists(path):
-                try:
-                    with open(path, "rb") as f:
-                        data = toml.load(f)
-                        self._merge_config(data)
-                except Exception as e:
-                    print(f"Warning: Failed to parse {path}: {e}")
+            # EAFP: open directly instead of stat-ing first (one syscall per path)
+            try:
+                with open(path, "rb") as f:
+                    data = toml_load(f)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Warning: Failed to parse {path}: {e}")
+            else:
+                self._merge_config(data)
 
     def _merge_config(self, new_data: Dict[str, Any]):
-        """Deep merge for simple dicts"""
-        for section, content in new_data.items():
-            if section not in self.config:
-                self.config[section] = content
-            elif isinstance(content, dict):
-                self.config[section].update(content)
+        """Deep merge for nested dicts (iterative, so nested tables like providers.gemini merge key by key)"""
+        stack = [(self.config, new_data)]
+        while stack:
+            dst, src = stack.pop()
+            for key, value in src.items():
+                if isinstance(value, dict) and isinstance(dst.get(key), dict):
+                    stack.append((dst[key], value))
+                else:
+                    dst[key] = value
 
     def get_provider_config(self, provider_name: str) -> Dict[str, str]:
         providers = self.config.get("providers", {})
@@ -110,6 +151,14 @@ class ConfigManager:
         """Get the universal prompt template."""
         return self.config.get("prompts", {}).get("universal", "")
 
+    def get_compact_diff(self) -> bool:
+        """Whether to send only changed lines (no context) to the provider."""
+        return bool(self.config.get("core", {}).get("compact_diff", False))
+
+    def get_fast_path(self) -> bool:
+        """Whether trivial diffs (version bump, whitespace) skip the AI."""
+        return bool(self.config.get("core", {}).get("fast_path", True))
+
     def get_config_path(self) -> str:
         """Returns the path to user's config file (creates if needed)."""
         return os.path.expanduser("~/.sensei.toml")
@@ -122,35 +171,72 @@ class ConfigManager:
         config_path = self.get_config_path()
 
         # Read existing content or create new
-        if os.path.exists(config_path):
+        try:
             with open(config_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Update existing default_provider line
-            if re.search(r'^default_provider\s*=', content, re.MULTILINE):
-                content = re.sub(
-                    r'^default_provider\s*=\s*["\']?\w+["\']?',
-                    f'default_provider = "{provider_name}"',
-                    content,
-                    flags=re.MULTILINE
-                )
-            elif "[core]" in content:
-                # Add under [core] section
-                content = re.sub(
-                    r'(\[core\])',
-                    f'[core]\ndefault_provider = "{provider_name}"',
-                    content
-                )
-            else:
-                # Prepend [core] section
-                content = f'[core]\ndefault_provider = "{provider_name}"\n\n' + content
-        else:
+                content = self._update_default_provider(f.read(), provider_name)
+        except FileNotFoundError:
             # Create new config file
             content = f'[core]\ndefault_provider = "{provider_name}"\n'
 
-        with open(config_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Write to a temp file and rename, so a crash never leaves a half-written config.
+        # The rename targets the resolved path, so a symlinked (dotfiles) config stays a link
+        target_path = os.path.realpath(config_path)
+        tmp_path = target_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            if os.path.exists(target_path):
+                shutil.copymode(target_path, tmp_path)
+            os.replace(tmp_path, target_path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
 
         # Update in-memory config
         self.config["core"]["default_provider"] = provider_name
         return True
+
+    def _update_default_provider(self, content: str, provider_name: str) -> str:
+        """Returns config file content with [core] default_provider set.
+
+        Uses a structured TOML round-trip (tomlkit keeps comments and layout)
+        when available, otherwise falls back to line-based regex edits.
+        """
+        tomlkit = load_tomlkit()
+        if tomlkit:
+            try:
+                doc = tomlkit.parse(content)
+            except Exception:
+                pass  # Not valid TOML - let the regex path patch it
+            else:
+                if "core" not in doc:
+                    doc["core"] = tomlkit.table()
+                doc["core"]["default_provider"] = provider_name
+                return tomlkit.dumps(doc)
+
+        # Update existing default_provider line
+        if self._DEFAULT_LINE_RE.search(content):
+            content = self._DEFAULT_SUB_RE.sub(
+                f'default_provider = "{provider_name}"',
+                content
+            )
+        elif "[core]" in content:
+            # Add under [core] section
+            content = self._CORE_RE.sub(
+                f'[core]\ndefault_provider = "{provider_name}"',
+                content
+            )
+        else:
+            # Prepend [core] section
+            content = f'[core]\ndefault_provider = "{provider_name}"\n\n' + content
+
+        return content
+
+
+@functools.lru_cache(maxsize=1)
+def get_config_manager() -> ConfigManager:
+    """Returns the shared ConfigManager, loading config files only once per process."""
+    return ConfigManager()
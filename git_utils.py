@@ -1,33 +1,108 @@
 """Git utilities for sensei."""
+import functools
+import json
+import os
 import subprocess
 import re
-from typing import Optional
+from typing import FrozenSet, Optional, Tuple
 
+# Issue ID patterns, tried in order: (compiled regex, format string or None)
+ISSUE_PATTERNS = [
+    (re.compile(r'(AB#\d+)', re.IGNORECASE), None),          # Azure DevOps
+    (re.compile(r'issue[/-](\d+)', re.IGNORECASE), '#{}'),   # issue-123 -> #123
+    (re.compile(r'sc[/-](\d+)', re.IGNORECASE), 'sc-{}'),    # Shortcut
+    (re.compile(r'(?:^|/)#(\d+)', re.IGNORECASE), '#{}'),    # GitHub/GitLab
+    (re.compile(r'([A-Z]{2,}-\d+)', re.IGNORECASE), None),   # Jira/Linear
+    (re.compile(r'[/-](\d+)[/-]', re.IGNORECASE), '#{}'),    # feature/1-description -> #1
+    (re.compile(r'[/-](\d+)$', re.IGNORECASE), '#{}'),       # feature/1 -> #1
+]
 
+# Persistent get_git_context cache, stored inside the repo's git dir
+CONTEXT_CACHE_FILE = "sensei-cache.json"
+
+# File header lines worth keeping in a compacted diff
+COMPACT_HEADER_LINES = (b"new file", b"deleted file", b"rename from", b"rename to", b"Binary files")
+
+BRANCH_PREFIX_PATTERN = re.compile(r'^([a-z]+)[/-]', re.IGNORECASE)
+
+BRANCH_TYPE_MAP = {
+    'feature': 'feat',
+    'feat': 'feat',
+    'fix': 'fix',
+    'bugfix': 'fix',
+    'hotfix': 'hotfix',
+    'refactor': 'refactor',
+    'docs': 'docs',
+    'chore': 'chore',
+    'test': 'test',
+    'ci': 'ci',
+}
+
+
+@functools.lru_cache(maxsize=1)
 def get_current_branch() -> str:
-    """Get current git branch name."""
+    """Get current git branch name.
+
+    Reads .git/HEAD directly; only spawns git if the file cannot be read
+    or the repo uses reftable (whose HEAD file is a placeholder).
+    Returns an empty string on a detached HEAD, like --show-current.
+    """
+    git_dir = find_git_dir()
+    if git_dir and not os.path.exists(os.path.join(git_dir, "reftable")):
+        try:
+            with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+                head = f.read().strip()
+        except OSError:
+            pass
+        else:
+            if head.startswith("ref: refs/heads/"):
+                return head[len("ref: refs/heads/"):]
+            return ""
+
     result = subprocess.run(
         ["git", "branch", "--show-current"],
-        capture_output=True, text=True, encoding='utf-8'
+        capture_output=True
     )
-    return result.stdout.strip()
+    return result.stdout.strip().decode('utf-8', 'replace')
 
 
-def get_staged_diff() -> Optional[str]:
-    """Get staged changes diff. Returns None if no staged changes."""
-    try:
-        subprocess.check_call(["git", "diff", "--staged", "--quiet"])
-        return None  # No staged changes
-    except subprocess.CalledProcessError:
-        pass
+def get_staged_diff() -> Optional[bytes]:
+    """Get staged changes diff as raw bytes. Returns None if no staged changes.
 
+    Bytes can be piped to the AI provider as-is; callers decode once where
+    they need text (secrets scan, heuristics).
+    """
+    # --exit-code: 0 means nothing staged, 1 means the diff is in stdout
     result = subprocess.run(
-        ["git", "diff", "--staged"],
-        capture_output=True, text=True, encoding='utf-8', errors='replace'
+        ["git", "diff", "--staged", "--exit-code"],
+        capture_output=True
     )
+    if result.returncode == 0:
+        return None  # No staged changes
     return result.stdout
 
 
+def compact_diff(diff: bytes) -> bytes:
+    """Strip a diff down to what describes the change: file headers, hunk
+    markers and +/- lines. Context lines, index and ---/+++ lines are dropped."""
+    out = []
+    in_hunk = False
+    for line in diff.splitlines(keepends=True):
+        if line.startswith(b"diff --git "):
+            in_hunk = False
+            out.append(line)
+        elif line.startswith(b"@@"):
+            in_hunk = True
+            out.append(line)
+        elif in_hunk:
+            # Inside a hunk "---"/"+++" are real removed/added lines
+            if line.startswith((b"+", b"-")):
+                out.append(line)
+        elif line.startswith(COMPACT_HEADER_LINES):
+            out.append(line)
+    return b"".join(out)
+
+
 def create_commit(message: str) -> bool:
     """Create a git commit with the given message."""
     try:
@@ -37,6 +112,7 @@ def create_commit(message: str) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=512)
 def extract_issue_id(branch_name: str) -> Optional[str]:
     """
     Extract issue ID from branch name.
@@ -44,18 +120,8 @@ def extract_issue_id(branch_name: str) -> Optional[str]:
     Supports: Jira (PROJ-123), GitHub (#123), Azure DevOps (AB#123),
     Linear (LIN-123), Shortcut (sc-123)
     """
-    patterns = [
-        (r'(AB#\d+)', None),                # Azure DevOps
-        (r'issue[/-](\d+)', '#{}'),         # issue-123 -> #123
-        (r'sc[/-](\d+)', 'sc-{}'),          # Shortcut
-        (r'(?:^|/)#(\d+)', '#{}'),          # GitHub/GitLab
-        (r'([A-Z]{2,}-\d+)', None),         # Jira/Linear
-        (r'[/-](\d+)[/-]', '#{}'),          # feature/1-description -> #1
-        (r'[/-](\d+)$', '#{}'),             # feature/1 -> #1
-    ]
-
-    for pattern, format_str in patterns:
-        match = re.search(pattern, branch_name, re.IGNORECASE)
+    for pattern, format_str in ISSUE_PATTERNS:
+        match = pattern.search(branch_name)
         if match:
             if format_str:
                 return format_str.format(match.group(1))
@@ -64,58 +130,74 @@ def extract_issue_id(branch_name: str) -> Optional[str]:
     return None
 
 
+@functools.lru_cache(maxsize=512)
 def extract_branch_type(branch_name: str) -> Optional[str]:
     """
     Extract work type from branch prefix.
 
     Returns: feat, fix, hotfix, refactor, docs, chore, or None
     """
-    prefix_map = {
-        'feature': 'feat',
-        'feat': 'feat',
-        'fix': 'fix',
-        'bugfix': 'fix',
-        'hotfix': 'hotfix',
-        'refactor': 'refactor',
-        'docs': 'docs',
-        'chore': 'chore',
-        'test': 'test',
-        'ci': 'ci',
-    }
-
-    match = re.match(r'^([a-z]+)[/-]', branch_name, re.IGNORECASE)
+    match = BRANCH_PREFIX_PATTERN.match(branch_name)
     if match:
         prefix = match.group(1).lower()
-        return prefix_map.get(prefix)
+        return BRANCH_TYPE_MAP.get(prefix)
 
     return None
 
 
-def is_branch_pushed(branch_name: str) -> bool:
-    """Check if branch exists on remote origin."""
+@functools.lru_cache(maxsize=1)
+def get_ref_snapshot() -> Tuple[str, FrozenSet[str]]:
+    """
+    Read current branch and all local/origin refs with a single git call.
+
+    Returns (branch, refs) where refs holds full names such as
+    'refs/heads/main' or 'refs/remotes/origin/feature/x'. Branch is empty
+    on a detached HEAD or unborn branch.
+    """
     result = subprocess.run(
-        ["git", "ls-remote", "--heads", "origin", branch_name],
-        capture_output=True, text=True, encoding='utf-8'
+        ["git", "for-each-ref", "--format=%(HEAD)%(refname)",
+         "refs/heads", "refs/remotes/origin"],
+        capture_output=True
     )
-    return bool(result.stdout.strip())
+    branch = ""
+    refs = set()
+    for line in result.stdout.decode('utf-8', 'replace').splitlines():
+        ref = line[1:]
+        refs.add(ref)
+        if line.startswith('*'):
+            branch = ref[len('refs/heads/'):]
+    return branch, frozenset(refs)
 
 
-def get_commits_ahead_of_main() -> int:
-    """Count commits ahead of main/master branch."""
-    for main_branch in ['main', 'master']:
+@functools.lru_cache(maxsize=None)
+def get_commits_ahead_of_main(refs: Optional[FrozenSet[str]] = None) -> int:
+    """Count commits ahead of main/master branch.
+
+    If refs from get_ref_snapshot() are given, only an existing base branch
+    is queried, so at most one rev-list is spawned.
+    """
+    candidates = ['main', 'master']
+    if refs is not None:
+        candidates = [b for b in candidates if f"refs/heads/{b}" in refs]
+    for main_branch in candidates:
         result = subprocess.run(
             ["git", "rev-list", f"{main_branch}..HEAD", "--count"],
-            capture_output=True, text=True, encoding='utf-8'
+            capture_output=True
         )
         if result.returncode == 0:
-            return int(result.stdout.strip())
+            return int(result.stdout)  # int() accepts bytes and surrounding whitespace
     return 0
 
 
+@functools.lru_cache(maxsize=1)
 def get_git_context() -> dict:
     """
     Gather full git context for AI prompt.
 
+    Memoized per process; call clear_git_cache() after the repo changes.
+    Also persisted in .git/sensei-cache.json, keyed on HEAD and the state of
+    the refs it depends on, so repeated runs on an unchanged repo spawn no git.
+
     Returns dict with:
         - branch: current branch name
         - issue_id: extracted issue ID or None
@@ -124,11 +206,25 @@ def get_git_context() -> dict:
         - commits_ahead: number of commits ahead of main
         - context_summary: human-readable summary
     """
-    branch = get_current_branch()
+    git_dir = find_git_dir()
+    cache_key = get_context_cache_key(git_dir) if git_dir else None
+    if cache_key:
+        cached = read_context_cache(git_dir, cache_key)
+        if cached is not None:
+            return cached
+
+    branch, refs = get_ref_snapshot()
+    if not branch:
+        # Unborn branch has no ref yet
+        branch = get_current_branch()
     issue_id = extract_issue_id(branch)
     branch_type = extract_branch_type(branch)
-    is_pushed = is_branch_pushed(branch)
-    commits_ahead = get_commits_ahead_of_main()
+    # Remote-tracking refs answer this locally, without a network round-trip
+    is_pushed = f"refs/remotes/origin/{branch}" in refs
+    if branch in ['main', 'master']:
+        commits_ahead = 0
+    else:
+        commits_ahead = get_commits_ahead_of_main(refs)
 
     # Build context summary
     summary_parts = []
@@ -145,7 +241,7 @@ def get_git_context() -> dict:
         elif commits_ahead > 0:
             summary_parts.append(f"{commits_ahead} commit(s) ahead of main")
 
-    return {
+    context = {
         'branch': branch,
         'issue_id': issue_id,
         'branch_type': branch_type,
@@ -153,3 +249,92 @@ def get_git_context() -> dict:
         'commits_ahead': commits_ahead,
         'context_summary': '; '.join(summary_parts) if summary_parts else None,
     }
+
+    if cache_key:
+        write_context_cache(git_dir, cache_key, context)
+
+    return context
+
+
+def find_git_dir(start: Optional[str] = None) -> Optional[str]:
+    """Locate the .git directory by walking up from start (default: cwd), without spawning git."""
+    path = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            # Worktree/submodule: ".git" is a file with "gitdir: <path>"
+            try:
+                with open(candidate, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(path, line[len("gitdir:"):].strip()))
+            return None
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def get_context_cache_key(git_dir: str) -> Optional[list]:
+    """
+    Build a cache key from HEAD and the refs get_git_context reads.
+
+    Returns None when the layout is not a plain .git directory (e.g. linked
+    worktrees keep refs elsewhere, reftable repos have no ref files and a
+    placeholder HEAD) so callers fall back to asking git.
+    """
+    if os.path.exists(os.path.join(git_dir, "commondir")):
+        return None
+    if os.path.exists(os.path.join(git_dir, "reftable")):
+        return None
+    try:
+        with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+
+    ref_paths = ["packed-refs", "refs/heads/main", "refs/heads/master"]
+    if head.startswith("ref: refs/heads/"):
+        branch = head[len("ref: refs/heads/"):]
+        ref_paths += [f"refs/heads/{branch}", f"refs/remotes/origin/{branch}"]
+
+    key = [head]
+    for ref_path in ref_paths:
+        try:
+            st = os.stat(os.path.join(git_dir, ref_path))
+            key.append([ref_path, st.st_mtime_ns, st.st_size])
+        except OSError:
+            key.append([ref_path, None, None])
+    return key
+
+
+def read_context_cache(git_dir: str, key: list) -> Optional[dict]:
+    """Return the cached git context if it was stored under the same key."""
+    try:
+        with open(os.path.join(git_dir, CONTEXT_CACHE_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    return data.get("value")
+
+
+def write_context_cache(git_dir: str, key: list, context: dict) -> None:
+    """Store git context in the repo's .git dir. Failures are ignored (cache is optional)."""
+    try:
+        with open(os.path.join(git_dir, CONTEXT_CACHE_FILE), "w", encoding="utf-8") as f:
+            json.dump({"key": key, "value": context}, f)
+    except OSError:
+        pass
+
+
+def clear_git_cache() -> None:
+    """Drop memoized git state (e.g. after a commit or in tests)."""
+    for func in (get_current_branch, get_ref_snapshot,
+                 get_commits_ahead_of_main, get_git_context):
+        func.cache_clear()
@@ -1,35 +1,67 @@
 import sys
 import re
-import os
+
+# Looking for lines: diff --git a/path/file b/path/file
+FILE_PATTERN = re.compile(rb"^diff --git a/(.*) b/(.*)", re.MULTILINE)
+
+# Keywords in added lines (not '+++' headers) that hint at the type of change
+FIX_LINE_PATTERN = re.compile(rb"^\+(?!\+\+).*?(?:fix|bug|error)", re.MULTILINE | re.IGNORECASE)
+TEST_LINE_PATTERN = re.compile(rb"^\+(?!\+\+).*?test", re.MULTILINE | re.IGNORECASE)
+
+# Diffs larger than this (in characters) are never treated as trivial
+FAST_PATH_MAX_SIZE = 4096
+
+# version = "1.2.3", __version__ = '1.2.3', "version": "1.2.3"
+VERSION_LINE_PATTERN = re.compile(r"""^\s*["']?(?:__version__|version)["']?\s*[=:]\s*["']?([0-9][\w.+\-]*)""")
+
+# Files where leading whitespace is syntax, so re-indenting is never "just whitespace"
+INDENT_SENSITIVE_EXTENSIONS = frozenset(['.py', '.yml', '.yaml', '.mk'])
+INDENT_SENSITIVE_FILES = frozenset(['Makefile', 'makefile', 'GNUmakefile'])
+
+# Map extensions to types
+EXTENSION_TYPES = {
+    **dict.fromkeys(['.md', '.txt', '.rst'], "docs"),
+    **dict.fromkeys(['.css', '.scss', '.less', '.styl'], "style"),
+    **dict.fromkeys(['.py', '.js', '.ts', '.go', '.rs', '.java', '.c', '.cpp'], "feat"),
+}
+
+CHORE_FILES = frozenset(['.gitignore', 'requirements.txt', 'Dockerfile', 'package.json', '.env.example'])
+
+# Order in which detected types win
+TYPE_PRIORITY = ("docs", "style", "test", "chore", "feat")
 
 def parse_diff(diff_content):
     """
     Analyzes the diff and returns a list of modified files and hints about the type of changes.
+    Accepts raw bytes (as read from stdin) or str; only file names are decoded.
     """
-    files = []
-    is_fix = False
-    is_test = False
-    
-    # Simple diff parser
-    # Looking for lines: diff --git a/path/file b/path/file
-    file_pattern = re.compile(r"diff --git a/(.*) b/(.*)")
-    
-    for line in diff_content.splitlines():
-        # Detect files
-        match = file_pattern.match(line)
-        if match:
-            files.append(match.group(1))
-        
-        # Heuristics for content (search for keywords in added lines)
-        if line.startswith("+") and not line.startswith("+++"):
-            content_lower = line.lower()
-            if "fix" in content_lower or "bug" in content_lower or "error" in content_lower:
-                is_fix = True
-            if "test" in content_lower:
-                is_test = True
+    if isinstance(diff_content, str):
+        diff_content = diff_content.encode('utf-8', 'surrogateescape')
+
+    # Detect files in one pass over the whole buffer
+    files = [
+        match.group(1).decode('utf-8', 'replace')
+        for match in FILE_PATTERN.finditer(diff_content)
+    ]
+
+    # Heuristics for content - each search stops at the first matching added line
+    is_fix = FIX_LINE_PATTERN.search(diff_content) is not None
+    is_test = TEST_LINE_PATTERN.search(diff_content) is not None
 
     return files, is_fix, is_test
 
+def split_extension(path):
+    """
+    Splits a git path into (file name without extension, extension).
+    Same result as os.path.splitext on the basename: leading dots are not an
+    extension ('.gitignore' -> ('.gitignore', '')). Git always uses '/'.
+    """
+    name = path.rpartition('/')[2]
+    stem, dot, ext = name.rpartition('.')
+    if not dot or not stem.strip('.'):
+        return name, ''
+    return stem, '.' + ext
+
 def determine_type(files, is_fix_content):
     """Determines the commit type based on file extensions."""
     if not files:
@@ -39,20 +71,23 @@ def determine_type(files, is_fix_content):
     if is_fix_content:
         return "fix"
 
-    extensions = [os.path.splitext(f)[1] for f in files]
-    
-    # Map extensions to types
-    if any(ext in ['.md', '.txt', '.rst'] for ext in extensions):
-        return "docs"
-    if any(ext in ['.css', '.scss', '.less', '.styl'] for ext in extensions):
-        return "style"
-    if any('test' in f.lower() for f in files):
-        return "test"
-    if any(f in ['.gitignore', 'requirements.txt', 'Dockerfile', 'package.json', '.env.example'] for f in files):
-        return "chore"
-    if any(ext in ['.py', '.js', '.ts', '.go', '.rs', '.java', '.c', '.cpp'] for ext in extensions):
-        return "feat"
-    
+    # Single pass over files, then pick the highest-priority type seen
+    found = set()
+    for f in files:
+        ext_type = EXTENSION_TYPES.get(split_extension(f)[1])
+        if ext_type == TYPE_PRIORITY[0]:
+            return ext_type  # Nothing can outrank it, skip the remaining files
+        if ext_type:
+            found.add(ext_type)
+        if 'test' in f.lower():
+            found.add("test")
+        if f in CHORE_FILES:
+            found.add("chore")
+
+    for commit_type in TYPE_PRIORITY:
+        if commit_type in found:
+            return commit_type
+
     return "chore"
 
 def generate_message(diff_content):
@@ -64,9 +99,9 @@ def generate_message(diff_content):
     commit_type = determine_type(files, is_fix)
     
     # Scope: main file name (without path and extension)
-    main_file = os.path.basename(files[0])
-    scope = os.path.splitext(main_file)[0]
-    
+    main_file = files[0].rpartition('/')[2]
+    scope = split_extension(main_file)[0]
+
     if len(files) > 1:
         scope = f"{scope}+" # Signal that more than one file was changed
 
@@ -85,23 +120,76 @@ def generate_message(diff_content):
 
     return f"{commit_type}({scope}): {description}"
 
-if __name__ == "__main__":
-    # Non-interactive mode: read from stdin, write to stdout
+def fast_classify(diff_content):
+    """
+    Recognizes trivial single-file diffs that need no AI: a version bump or
+    a whitespace-only edit. Returns a commit message, or None otherwise.
+    """
+    if isinstance(diff_content, bytes):
+        diff_content = diff_content.decode('utf-8', 'replace')
+    if len(diff_content) > FAST_PATH_MAX_SIZE:
+        return None
+
+    files = []
+    added, removed = [], []
+    in_hunk = False
+    for line in diff_content.split("\n"):
+        if line.startswith("diff --git "):
+            match = FILE_PATTERN.match(line.encode('utf-8', 'surrogateescape'))
+            if match:
+                files.append(match.group(1).decode('utf-8', 'replace'))
+            in_hunk = False
+        elif line.startswith("@@"):
+            in_hunk = True
+        elif in_hunk and line.startswith("+"):
+            added.append(line[1:])
+        elif in_hunk and line.startswith("-"):
+            removed.append(line[1:])
+
+    if len(files) != 1 or not (added or removed):
+        return None
+    scope, ext = split_extension(files[0])
+
+    if len(added) == 1 and len(removed) == 1:
+        new = VERSION_LINE_PATTERN.match(added[0])
+        old = VERSION_LINE_PATTERN.match(removed[0])
+        if new and old and new.group(1) != old.group(1):
+            return f"chore({scope}): bump version to {new.group(1)}"
+
+    # Same non-blank tokens once whitespace runs collapse to one space;
+    # indentation must also match where it carries meaning
+    keep_indent = ext in INDENT_SENSITIVE_EXTENSIONS or scope in INDENT_SENSITIVE_FILES
+
+    def squash(lines):
+        if keep_indent:
+            return [line[:len(line) - len(line.lstrip())] + ' '.join(line.split())
+                    for line in lines if line.strip()]
+        return [' '.join(line.split()) for line in lines if line.strip()]
+
+    if squash(added) == squash(removed):
+        return f"style({scope}): fix whitespace"
+
+    return None
+
+def generate(diff_content):
+    """
+    Entry point shared by in-process callers and the stdin/stdout mode.
+    Never raises: empty input and parsing errors produce a placeholder message.
+    """
     try:
-        # Force UTF-8 encoding for stdin/stdout
-        if sys.stdin.encoding.lower() != 'utf-8':
-            sys.stdin.reconfigure(encoding='utf-8')
-        if sys.stdout.encoding.lower() != 'utf-8':
-            sys.stdout.reconfigure(encoding='utf-8')
-            
-        input_diff = sys.stdin.read()
-        if not input_diff.strip():
+        if not diff_content.strip():
             # Fallback for empty input
-            print("chore: empty commit")
-        else:
-            message = generate_message(input_diff)
-            print(message)
-            
+            return "chore: empty commit"
+        return generate_message(diff_content)
     except Exception as e:
         # Fallback in case of parsing error
-        print(f"chore: manual check required (error: {str(e)})")
\ No newline at end of file
+        return f"chore: manual check required (error: {str(e)})"
+
+def write_output(text):
+    """Writes a line to stdout as UTF-8 bytes, whatever the console encoding."""
+    sys.stdout.buffer.write(text.encode('utf-8') + b"\n")
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    # Non-interactive mode: read raw bytes from stdin, write UTF-8 bytes to stdout
+    write_output(generate(sys.stdin.buffer.read()))
@@ -1,26 +1,58 @@
 """Git-Sensei: AI-powered commit message generator."""
-import shutil
 import sys
 import os
 import re
 import subprocess
-import tempfile
 import typer
-from typing import Optional
+from typing import Optional, Union
 
-from config import ConfigManager
-from providers import AIProvider
-from secrets import scan_diff, format_warning
-from git_utils import get_staged_diff, get_current_branch, extract_issue_id, create_commit, get_git_context
+from config import get_config_manager
+from providers import AIProvider, PIPE_BUFSIZE, which
+from git_utils import get_staged_diff, create_commit, get_git_context, compact_diff
 
 app = typer.Typer(
     help="Git-Sensei: AI-powered commit message generator. Quick start: git add . && sensei commit",
     add_completion=False,
     rich_markup_mode=None,
 )
-config_mgr = ConfigManager()
-
-CONVENTIONAL_REGEX = r"^(feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert)(\([a-z0-9_\-\./+]+\))?: .+$"
+config_mgr = get_config_manager()
+
+COMMIT_TYPES = ("feat", "fix", "docs", "style", "refactor", "perf", "test", "build", "ci", "chore", "revert")
+CONVENTIONAL_REGEX = r"^(" + "|".join(COMMIT_TYPES) + r")(\([a-z0-9_\-\./+]+\))?: .+$"
+CONVENTIONAL_RE = re.compile(CONVENTIONAL_REGEX, re.MULTILINE)
+# Cheap str.startswith prefilter: only lines starting like "feat:" / "feat(" can match
+TYPE_PREFIXES = tuple(f"{t}{sep}" for t in COMMIT_TYPES for sep in (":", "("))
+# The commit header is expected near the top of the AI output
+MAX_HEADER_SCAN_LINES = 20
+
+# AI-generated signatures and footers stripped from commit messages
+SIGNATURE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE | re.DOTALL)
+    for pattern in (
+        r'\n*🤖.*Generated with.*$',
+        r'\n*Generated with \[?Claude.*$',
+        r'\n*Co-Authored-By:.*$',
+        r'\n*---\n*.*Generated.*$',
+        r'\n*\*Generated by.*$',
+    )
+]
+
+# Script path (and whether it exists) for the out-of-process fallback, checked once at import
+LOCAL_BRIDGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_bridge.py")
+LOCAL_BRIDGE_EXISTS = os.path.exists(LOCAL_BRIDGE_PATH)
+
+# Diffs this large (in characters) only get scanned until MAX_REPORTED_SECRETS findings
+LARGE_DIFF_SIZE = 2_000_000
+MAX_REPORTED_SECRETS = 20
+
+# Review loop answers -> action (single dict lookup per keypress)
+REVIEW_ACTIONS = {
+    'y': 'accept', 'yes': 'accept',
+    'e': 'edit', 'edit': 'edit',
+    'r': 'retry', 'retry': 'retry',
+    'n': 'abort', 'no': 'abort',
+}
+REVIEW_PROMPT = "[y]es, [n]o, [e]dit, [r]etry"
 
 DEFAULT_PROMPT = """You are a professional git commit message generator.
 
@@ -75,41 +107,70 @@ def build_prompt_with_context(base_prompt: str, git_context: dict) -> str:
 
 def strip_signatures(message: str) -> str:
     """Remove AI-generated signatures and footers from commit message."""
-    patterns = [
-        r'\n*🤖.*Generated with.*$',
-        r'\n*Generated with \[?Claude.*$',
-        r'\n*Co-Authored-By:.*$',
-        r'\n*---\n*.*Generated.*$',
-        r'\n*\*Generated by.*$',
-    ]
     result = message
-    for pattern in patterns:
-        result = re.sub(pattern, '', result, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
+    for pattern in SIGNATURE_PATTERNS:
+        result = pattern.sub('', result)
     return result.strip()
 
 
 def clean_response(raw_output: str) -> str:
     """Extract commit message from AI response and remove signatures."""
-    match = re.search(CONVENTIONAL_REGEX, raw_output, re.MULTILINE)
-    if match:
-        message = raw_output[match.start():].strip()
-    else:
-        message = raw_output.strip()
+    message = raw_output.strip()
+    start = 0
+    # Walk line boundaries with str.find: bounded work, no list of lines
+    for _ in range(MAX_HEADER_SCAN_LINES):
+        end = raw_output.find('\n', start)
+        line = raw_output[start:] if end == -1 else raw_output[start:end]
+        # Regex only runs on lines that already look like "type:" or "type("
+        if line.startswith(TYPE_PREFIXES) and CONVENTIONAL_RE.match(line):
+            message = raw_output[start:].strip()
+            break
+        if end == -1:
+            break
+        start = end + 1
     return strip_signatures(message)
 
 
-def call_local_fallback(diff: str) -> str:
-    """Fallback to local heuristic engine."""
-    local_bridge = os.path.join(os.path.dirname(__file__), "local_bridge.py")
-    if os.path.exists(local_bridge):
-        proc = subprocess.Popen(
-            [sys.executable, local_bridge],
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-            text=True, encoding='utf-8'
+def call_local_fallback(diff: Union[str, bytes]) -> str:
+    """Fallback to local heuristic engine.
+
+    Runs in-process; a separate interpreter is only spawned if the module
+    cannot be imported but the script is on disk.
+    """
+    try:
+        import local_bridge as bridge
+    except Exception:
+        pass
+    else:
+        return bridge.generate(diff).strip()
+
+    if not LOCAL_BRIDGE_EXISTS:
+        return "chore: update files"
+    if isinstance(diff, str):
+        diff = diff.encode('utf-8')
+    try:
+        proc = subprocess.run(
+            [sys.executable, LOCAL_BRIDGE_PATH],
+            input=diff, stdout=subprocess.PIPE, bufsize=PIPE_BUFSIZE
         )
-        stdout, _ = proc.communicate(input=diff)
-        return stdout.strip()
-    return "chore: update files"
+    except OSError:
+        return "chore: update files"
+    return proc.stdout.decode('utf-8', 'replace').strip() or "chore: update files"
+
+
+def read_review_choice() -> str:
+    """Read the review answer: a single keypress on a terminal (Enter = yes),
+    a full line otherwise (pipes, tests)."""
+    if not sys.stdin.isatty():
+        return typer.prompt(REVIEW_PROMPT, default="y").lower()
+
+    typer.echo(f"{REVIEW_PROMPT} [y]: ", nl=False)
+    key = typer.getchar()
+    typer.echo(key if key.isprintable() else "")
+    # Only Enter picks the default; a stray space or Tab must not commit
+    if key in ("\r", "\n"):
+        return "y"
+    return key.lower()
 
 
 def get_editor() -> Optional[str]:
@@ -124,12 +185,10 @@ def get_editor() -> Optional[str]:
 
     # Check git config
     try:
-        result = subprocess.run(
-            ['git', 'config', 'core.editor'],
-            capture_output=True, text=True, encoding='utf-8'
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
+        result = subprocess.run(['git', 'config', 'core.editor'], capture_output=True)
+        editor = result.stdout.decode('utf-8', 'replace').strip()
+        if result.returncode == 0 and editor:
+            return editor
     except Exception:
         pass
 
@@ -145,6 +204,8 @@ def edit_in_editor(message: str) -> Optional[str]:
 
     Returns edited message or None if editing failed/was cancelled.
     """
+    import tempfile  # Only needed when the user picks [e]dit
+
     editor = get_editor()
     if not editor:
         return None
@@ -205,7 +266,10 @@ def commit(
     dry_run: bool = typer.Option(False, "-d", "--dry-run", help="Preview without committing.")
 ):
     """Generate a commit message using AI."""
-    if not shutil.which("git"):
+    # Only this command scans diffs; ls/use/check skip this import
+    from secret_scan import scan_diff, format_warning
+
+    if not which("git"):
         typer.secho("Git not found!", fg=typer.colors.RED)
         sys.exit(1)
 
@@ -220,35 +284,63 @@ def commit(
 
     typer.echo(f"Using: {provider_name}")
 
+    # Git context only reads refs, so gather it in the background while git diff runs
+    from concurrent.futures import ThreadPoolExecutor
+    pool = ThreadPoolExecutor(max_workers=1)
+    context_future = pool.submit(get_git_context)
+    pool.shutdown(wait=False)
+
     # Get diff
-    diff = get_staged_diff()
-    if not diff:
+    diff_bytes = get_staged_diff()
+    if not diff_bytes:
         typer.secho("No staged changes.", fg=typer.colors.YELLOW)
         sys.exit(0)
 
-    # Secrets check
-    secrets = scan_diff(diff)
+    # Decode once for the scan and heuristics; the provider gets the raw bytes
+    diff = diff_bytes.decode('utf-8', 'replace')
+
+    # Secrets check - on huge diffs stop after the first few hits instead of scanning everything
+    limit = MAX_REPORTED_SECRETS if len(diff) >= LARGE_DIFF_SIZE else None
+    secrets = scan_diff(diff, limit=limit)
     if secrets:
         typer.secho(format_warning(secrets), fg=typer.colors.YELLOW)
+        if limit and len(secrets) == limit:
+            typer.secho(f"Showing first {limit} findings; the diff may contain more.", fg=typer.colors.YELLOW)
         if not typer.confirm("Continue anyway?", default=False):
             sys.exit(1)
 
     # Gather git context
-    git_context = get_git_context()
+    git_context = context_future.result()
 
     # Show context info
     if git_context.get('context_summary'):
         typer.secho(f"Context: {git_context['context_summary']}", fg=typer.colors.CYAN)
 
     # Generate message
-    typer.echo("Thinking...")
     # Priority: provider-specific prompt > universal prompt > default
     base_prompt = provider_cfg.get("prompt") or config_mgr.get_universal_prompt() or DEFAULT_PROMPT
     prompt = build_prompt_with_context(base_prompt, git_context)
     ai = AIProvider(provider_name, provider_cfg)
-    raw = ai.execute(diff, prompt)
+    # Optionally drop context lines: prompt size drives provider latency
+    payload = compact_diff(diff_bytes) if config_mgr.get_compact_diff() else diff_bytes
 
-    message = clean_response(raw) if raw else call_local_fallback(diff)
+    # Trivial changes (version bump, whitespace) don't need a model round-trip
+    # (local_bridge is optional: without it every diff goes to the provider)
+    message = None
+    if config_mgr.get_fast_path():
+        try:
+            from local_bridge import fast_classify
+        except ImportError:
+            pass
+        else:
+            message = fast_classify(diff)
+    if message:
+        typer.echo("Trivial change detected, skipping AI (use [r]etry to ask AI).")
+    else:
+        typer.echo("Thinking...")
+        # Re-running on the same staged diff reuses a recent answer; retry always asks again
+        raw = ai.execute(payload, prompt, use_cache=True)
+        message = clean_response(raw) if raw else call_local_fallback(diff_bytes)
 
     # Review loop
     while True:
@@ -259,23 +351,23 @@ def commit(
         if dry_run:
             break
 
-        choice = typer.prompt("[y]es, [n]o, [e]dit, [r]etry", default="y").lower()
+        action = REVIEW_ACTIONS.get(read_review_choice())
 
-        if choice in ('y', 'yes'):
+        if action == 'accept':
             if create_commit(message):
                 typer.secho("Committed!", fg=typer.colors.GREEN)
             break
-        elif choice in ('e', 'edit'):
+        elif action == 'edit':
             edited = edit_in_editor(message)
             if edited:
                 message = edited
             else:
                 typer.secho("Edit cancelled, keeping original message.", fg=typer.colors.YELLOW)
-        elif choice in ('r', 'retry'):
-            raw = ai.execute(diff, prompt)
+        elif action == 'retry':
+            raw = ai.execute(payload, prompt)
             if raw:
                 message = clean_response(raw)
-        elif choice in ('n', 'no'):
+        elif action == 'abort':
             typer.secho("Aborted.", fg=typer.colors.RED)
             break
 
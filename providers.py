@@ -1,69 +1,221 @@
+import atexit
+import functools
+import hashlib
+import os
+import shutil
 import subprocess
 import shlex
 import sys
-from typing import Optional
+import time
+from typing import List, Optional, Union
+
+# Pipe buffer for streaming diffs to provider CLIs
+PIPE_BUFSIZE = 1 << 20
+
+# A provider CLI that hangs (stuck login prompt, dead network) must not block a commit forever
+PROVIDER_TIMEOUT = 120  # seconds
+
+
+# On-disk cache of provider answers, keyed by provider + command + prompt + diff
+RESPONSE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".sensei", "cache")
+RESPONSE_CACHE_TTL = 3600  # seconds
+
+
+def read_cached_response(path: str) -> Optional[str]:
+    """Return a cached answer younger than RESPONSE_CACHE_TTL, else None.
+    Expired entries are deleted when found."""
+    try:
+        if time.time() - os.path.getmtime(path) > RESPONSE_CACHE_TTL:
+            _remove_file(path)
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+def write_cached_response(path: str, response: str):
+    """Store an answer; the cache is best-effort, write errors are ignored.
+    Entries past RESPONSE_CACHE_TTL are pruned first, so the directory stays small."""
+    cache_dir = os.path.dirname(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cutoff = time.time() - RESPONSE_CACHE_TTL
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    _remove_file(entry.path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response)
+    except OSError:
+        pass
+
+
+def write_prompt_file(system_prompt: str) -> str:
+    """Write the prompt to a temp file (removed at exit) and return its path."""
+    import tempfile
+    fd, path = tempfile.mkstemp(prefix="sensei-prompt-", suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(system_prompt)
+    atexit.register(_remove_file, path)
+    return path
+
+
+def _remove_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=32)
+def which(name: str) -> Optional[str]:
+    """shutil.which memoized per process (each uncached call stats every PATH entry)."""
+    return shutil.which(name)
+
 
 class AIProvider:
     def __init__(self, name: str, config: dict):
         self.name = name
         self.command_template = config.get("command")
         self.description = config.get("description", "")
+        # (system_prompt, args) of the last call; retries reuse the built command
+        self._prepared = None
+
+    @functools.cached_property
+    def arg_template(self) -> List[str]:
+        """The command template split into argv tokens (lexed once per provider).
+
+        On Windows, POSIX lexing would eat the backslashes in paths such as
+        C:\\cfg\\x.json, so tokens are split in non-POSIX mode and only their
+        surrounding quotes are removed.
+        """
+        if not self.command_template:
+            return []
+        if sys.platform != "win32":
+            return shlex.split(self.command_template)
+        tokens = shlex.split(self.command_template, posix=False)
+        return [
+            token[1:-1] if len(token) >= 2 and token[0] == token[-1] and token[0] in "\"'" else token
+            for token in tokens
+        ]
 
-    def execute(self, diff: str, system_prompt: str) -> str:
+    @property
+    def executable(self) -> Optional[str]:
+        """First word of the command template."""
+        return self.arg_template[0] if self.arg_template else None
+
+    def build_args(self, system_prompt: str):
+        """Build the subprocess args for a prompt.
+
+        Returns an argv list (run directly), or on Windows the full command
+        string when the executable is not a resolvable .exe (run via the shell).
+        """
+        if self._prepared and self._prepared[0] == system_prompt:
+            return self._prepared[1]
+
+        # Placeholders are filled in per token of the pre-split template, so the
+        # prompt itself is never lexed: its quotes and newlines stay in one argument.
+        replacements = []
+        if "{system_file}" in self.command_template:
+            # Long prompts stay out of argv; the file is written once per prompt
+            replacements.append(("{system_file}", write_prompt_file(system_prompt)))
+        replacements.append(("{system}", system_prompt))
+
+        def fill(text: str) -> str:
+            for placeholder, value in replacements:
+                text = text.replace(placeholder, value)
+            return text
+
+        if sys.platform == "win32":
+            resolved = which(self.executable)
+            if resolved and resolved.lower().endswith(".exe"):
+                # Launch the resolved binary directly - no cmd.exe in between
+                args = [resolved] + [fill(token) for token in self.arg_template[1:]]
+            else:
+                # .cmd/.bat shims (npm CLIs) and shell built-ins still need cmd.exe
+                args = fill(self.command_template)
+        else:
+            args = [fill(token) for token in self.arg_template]
+        self._prepared = (system_prompt, args)
+        return args
+
+    def cache_path(self, diff: bytes, system_prompt: str) -> str:
+        """Response cache file for this provider, prompt and diff."""
+        digest = hashlib.sha256()
+        for part in (self.name, self.command_template, system_prompt):
+            digest.update(part.encode("utf-8") + b"\0")
+        digest.update(diff)
+        return os.path.join(RESPONSE_CACHE_DIR, digest.hexdigest() + ".txt")
+
+    def execute(self, diff: Union[str, bytes], system_prompt: str, use_cache: bool = False) -> str:
         """
         Executes the provider CLI command.
-        Replaces {system} in the command template with the actual prompt.
-        Pipes 'diff' to stdin.
+        Replaces {system} in the command template with the actual prompt
+        ({system_file} with the path of a file holding it).
+        Pipes 'diff' to stdin (raw bytes are passed through without re-encoding).
+        With use_cache, an identical request answered within RESPONSE_CACHE_TTL
+        is served from disk instead of calling the provider again.
         """
         if not self.command_template:
             raise ValueError(f"Provider '{self.name}' has no command defined.")
 
-        # 1. Prepare Command
-        # We escape the system prompt to avoid shell injection issues when formatting
-        # Ideally, complex prompts should be passed differently, but for CLI wrappers this is standard.
-        # Note: simplistic replacement. 
-        final_cmd_str = self.command_template.replace("{system}", system_prompt)
-        
-        # 2. Execute
+        if isinstance(diff, str):
+            diff = diff.encode('utf-8')
+
+        cache_path = None
+        if use_cache:
+            cache_path = self.cache_path(diff, system_prompt)
+            cached = read_cached_response(cache_path)
+            if cached is not None:
+                return cached
+
+        import tempfile
+
         try:
-            if sys.platform == "win32":
-                # On Windows, using shell=True allows the system to resolve .cmd/.bat files automatically
-                # and handles built-in commands better. We pass the full string, not a list.
-                process = subprocess.Popen(
-                    final_cmd_str,
-                    shell=True,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8'
-                )
-            else:
-                # On POSIX, we split args and avoid shell=True for slightly better security/performance
-                args = shlex.split(final_cmd_str)
-                process = subprocess.Popen(
+            # 1. Prepare Command (cached, so a retry with the same prompt skips it)
+            args = self.build_args(system_prompt)
+
+            # 2. Execute
+            # subprocess.run feeds stdin and drains stdout concurrently;
+            # a large pipe buffer keeps big diffs from stalling between fills.
+            # stderr (progress spam from some CLIs) goes to a temp file and is only
+            # read back on failure.
+            # A plain string only comes back on Windows, where shell=True lets the system
+            # resolve .cmd/.bat files and built-in commands. Lists avoid the shell entirely.
+            with tempfile.TemporaryFile() as stderr_file:
+                process = subprocess.run(
                     args,
-                    stdin=subprocess.PIPE,
+                    shell=isinstance(args, str),
+                    input=diff,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8'
+                    stderr=stderr_file,
+                    bufsize=PIPE_BUFSIZE,
+                    timeout=PROVIDER_TIMEOUT
                 )
-            
-            stdout, stderr = process.communicate(input=diff)
+                if process.returncode != 0:
+                    stderr_file.seek(0)
+                    stderr = stderr_file.read().decode('utf-8', 'replace').strip()
 
             if process.returncode != 0:
                 # Basic error handling
-                error_msg = stderr.strip() if stderr else "Unknown error"
+                error_msg = stderr or "Unknown error"
                 print(f"\n[Provider Error] {self.name} failed (Exit Code {process.returncode})")
                 print(f"Details: {error_msg}")
                 return ""
 
-            return stdout.strip()
+            # Bytes mode skips universal newlines; normalise CRLF from Windows CLIs
+            response = process.stdout.decode('utf-8', 'replace').replace('\r\n', '\n').strip()
+            if cache_path and response:
+                write_cached_response(cache_path, response)
+            return response
 
+        except subprocess.TimeoutExpired:
+            print(f"\n[Provider Error] {self.name} failed (no answer within {PROVIDER_TIMEOUT}s)")
+            return ""
         except FileNotFoundError:
             print(f"\n[Error] Command not found for provider '{self.name}'.")
-            print(f"Command tried: {args[0]}")
+            print(f"Command tried: {args[0] if isinstance(args, list) else args}")
             print("Please check your installation or PATH.")
             return ""
         except Exception as e:
@@ -76,15 +228,11 @@ class AIProvider:
         We run it with --help or --version usually, but since the command is templated,
         we might just try to run the executable part.
         """
-        if not self.command_template:
+        if not self.executable:
             return False
 
-        # Extract just the executable (first word)
-        executable = shlex.split(self.command_template)[0]
-
         # Using shutil.which is safer than running it
-        import shutil
-        return shutil.which(executable) is not None
+        return which(self.executable) is not None
 
     def test_connection(self) -> tuple:
         """Test real connection to AI provider with simple prompt.
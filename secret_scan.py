@@ -0,0 +1,301 @@
+"""
+Secrets Shield - detects potential secrets in git diffs before sending to AI.
+"""
+import functools
+import re
+import math
+from collections import Counter
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+
+
+@dataclass
+class SecretMatch:
+    """Represents a detected secret."""
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ("line_num", "line", "pattern_name", "match")
+
+    line_num: int
+    line: str
+    pattern_name: str
+    match: str
+
+
+# Known secret patterns (regex)
+SECRET_PATTERNS = {
+    "AWS Access Key": r"AKIA[0-9A-Z]{16}",
+    "AWS Secret Key": r"(?i)aws_secret_access_key\s*[=:]\s*['\"]?([A-Za-z0-9/+=]{40})['\"]?",
+    "GitHub Token": r"ghp_[A-Za-z0-9]{36}",
+    "GitHub OAuth": r"gho_[A-Za-z0-9]{36}",
+    "GitHub PAT": r"github_pat_[A-Za-z0-9]{22}_[A-Za-z0-9]{59}",
+    "GitLab Token": r"glpat-[A-Za-z0-9\-]{20}",
+    "Slack Token": r"xox[baprs]-[0-9A-Za-z\-]{10,250}",
+    "Slack Webhook": r"https://hooks\.slack\.com/services/T[A-Z0-9]+/B[A-Z0-9]+/[A-Za-z0-9]+",
+    "Discord Webhook": r"https://discord(?:app)?\.com/api/webhooks/[0-9]+/[A-Za-z0-9_-]+",
+    "Google API Key": r"AIza[0-9A-Za-z\-_]{35}",
+    "Heroku API Key": r"(?i)heroku[_-]?api[_-]?key\s*[=:]\s*['\"]?([A-Fa-f0-9-]{36})['\"]?",
+    "JWT Token": r"eyJ[A-Za-z0-9_\-]+\.eyJ[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-.+/]*",
+    "Private Key": r"-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----",
+    "Generic API Key": r"(?i)(?:api[_-]?key|apikey|secret[_-]?key|access[_-]?token)\s*[=:]\s*['\"]?([A-Za-z0-9_\-]{20,256})['\"]?",
+    "Generic Password": r"(?i)(?:password|passwd|pwd)\s*[=:]\s*['\"]([^'\"\r\n]{8,256})['\"]",
+    "Bearer Token": r"(?i)bearer\s+[A-Za-z0-9_\-\.]+",
+    "Basic Auth": r"(?i)basic\s+[A-Za-z0-9+/=]{20,}",
+    "NPM Token": r"npm_[A-Za-z0-9]{36}",
+    "PyPI Token": r"pypi-[A-Za-z0-9]{60,}",
+    "Anthropic API Key": r"sk-ant-[A-Za-z0-9\-_]{90,}",
+    "OpenAI API Key": r"sk-[A-Za-z0-9]{48}",
+}
+
+COMPILED_PATTERNS = [(name, re.compile(pattern)) for name, pattern in SECRET_PATTERNS.items()]
+
+
+def _scoped(pattern: str) -> str:
+    """Wrap a pattern for use inside an alternation (leading (?i) becomes a scoped flag)."""
+    if pattern.startswith("(?i)"):
+        return "(?i:" + pattern[4:] + ")"
+    return "(?:" + pattern + ")"
+
+
+# One pass over a line tells whether any known pattern can match at all;
+# the individual patterns only run on the (rare) lines that hit
+ANY_SECRET_PATTERN = re.compile("|".join(_scoped(p) for p in SECRET_PATTERNS.values()))
+
+# Case-folded literals, at least one of which every SECRET_PATTERNS entry
+# requires; a line containing none of them cannot match any pattern
+SECRET_TRIGGERS = (
+    "akia", "aws_secret", "ghp_", "gho_", "github_pat_", "glpat-", "xox",
+    "hooks.slack", "discord", "aiza", "heroku", "eyj", "-----begin", "api",
+    "secret", "token", "pass", "pwd", "bearer", "basic", "npm_", "pypi-", "sk-",
+)
+
+# Entropy candidates: quoted strings and bare assignment values
+ENTROPY_PATTERNS = [
+    re.compile(r'["\']([A-Za-z0-9+/=_\-]{20,})["\']'),  # Quoted strings
+    re.compile(r'=\s*([A-Za-z0-9+/=_\-]{20,})\s*$'),     # Assignment values
+]
+
+# k * log2(k) for k = 0..256; entropy candidates are rarely longer than that
+KLOG2K_TABLE = [0.0] + [k * math.log2(k) for k in range(1, 257)]
+
+# New-file start line in a "@@ -x,y +a,b @@" hunk header
+HUNK_START_PATTERN = re.compile(r'\+(\d+)')
+
+
+@functools.lru_cache(maxsize=None)
+def _hyperscan_database():
+    """All SECRET_PATTERNS compiled into one Hyperscan database, or None
+    when hyperscan is not installed or rejects a pattern.
+
+    Imported on first scan, not at module load, so commands that never scan
+    a diff do not pay for the native library.
+    """
+    try:
+        import hyperscan  # Optional: one automaton pass per line for all patterns
+    except ImportError:
+        return None
+    expressions, flags = [], []
+    for pattern in SECRET_PATTERNS.values():
+        flag = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        if pattern.startswith("(?i)"):
+            pattern = pattern[4:]
+            flag |= hyperscan.HS_FLAG_CASELESS
+        expressions.append(pattern.encode())
+        flags.append(flag)
+    try:
+        db = hyperscan.Database()
+        db.compile(expressions=expressions, ids=list(range(len(expressions))), flags=flags)
+    except Exception:
+        return None
+    return db
+
+
+@functools.lru_cache(maxsize=None)
+def _re2_set():
+    """All SECRET_PATTERNS in one unanchored RE2 Set, or None when google-re2
+    is not installed or rejects a pattern. Imported lazily like hyperscan."""
+    try:
+        import re2  # Optional (google-re2): RE2 Set, used when hyperscan is missing
+    except ImportError:
+        return None
+    if not hasattr(re2, "Set"):
+        return None
+    try:
+        pattern_set = re2.Set.SearchSet()
+        for pattern in SECRET_PATTERNS.values():
+            # RE2's \s leaves out \v, which Python's \s (used for the match text) includes
+            pattern_set.Add(pattern.replace(r"\s", r"[\s\v]"))
+        pattern_set.Compile()
+    except Exception:
+        return None
+    return pattern_set
+
+
+def candidate_patterns(content: str) -> List[Tuple[str, "re.Pattern"]]:
+    """(name, compiled pattern) pairs that match somewhere in the line, in
+    SECRET_PATTERNS order. The match text itself still comes from `re`."""
+    folded = content.casefold()
+    if not any(trigger in folded for trigger in SECRET_TRIGGERS):
+        return []
+    db = _hyperscan_database()
+    if db is not None:
+        hits = set()
+        db.scan(
+            content.encode("utf-8", "replace"),
+            match_event_handler=lambda id_, start, end, flags, context: hits.add(id_)
+        )
+        return [COMPILED_PATTERNS[i] for i in sorted(hits)]
+    pattern_set = _re2_set()
+    if pattern_set is not None:
+        # Set ids follow insertion order, i.e. SECRET_PATTERNS order
+        return [COMPILED_PATTERNS[i] for i in sorted(pattern_set.Match(content) or [])]
+    if ANY_SECRET_PATTERN.search(content):
+        return COMPILED_PATTERNS
+    return []
+
+
+def calculate_entropy(s: str) -> float:
+    """Calculate Shannon entropy of a string."""
+    if not s:
+        return 0.0
+
+    # One C-level counting pass; H = (n*log2(n) - sum(k*log2(k))) / n
+    n = len(s)
+    counts = Counter(s).values()
+    if n < len(KLOG2K_TABLE):
+        # Every count k <= n, so the whole sum is table lookups (no libm calls)
+        return (KLOG2K_TABLE[n] - sum(map(KLOG2K_TABLE.__getitem__, counts))) / n
+    log2 = math.log2
+    return log2(n) - sum(k * log2(k) for k in counts) / n
+
+
+def check_high_entropy(line: str, threshold: float = 4.5) -> List[Tuple[str, float]]:
+    """
+    Find high-entropy strings that might be secrets.
+    Returns list of (suspicious_string, entropy) tuples.
+    """
+    # Both candidate shapes need a quote or '=' and a 20+ char value:
+    # cheap substring checks rule out most code lines before any regex runs
+    if len(line) < 20 or not ('=' in line or '"' in line or "'" in line):
+        return []
+
+    suspicious = []
+    # Entropy never exceeds log2(distinct chars), so tokens with fewer than
+    # 2**threshold distinct characters cannot reach the threshold
+    min_distinct = 2 ** threshold
+
+    # Look for quoted strings or assignment values
+    for pattern in ENTROPY_PATTERNS:
+        for match in pattern.finditer(line):
+            value = match.group(1)
+            if len(set(value)) < min_distinct:
+                continue
+            entropy = calculate_entropy(value)
+            if entropy >= threshold:
+                suspicious.append((value, entropy))
+
+    return suspicious
+
+
+def shorten(text: str, width: int = 50) -> str:
+    """Truncate a matched value for display."""
+    return text[:width] + "..." if len(text) > width else text
+
+
+def scan_diff(diff: str, limit: Optional[int] = None) -> List[SecretMatch]:
+    """
+    Scan a git diff for potential secrets.
+    Only scans added lines (starting with +).
+    Returns list of SecretMatch objects; stops early once `limit` are found.
+    """
+    return list(islice(iter_secrets(diff), limit))
+
+
+def iter_secrets(diff: str) -> Iterator[SecretMatch]:
+    """
+    Lazily yield SecretMatch objects for added lines in a git diff.
+    Consumers can stop iterating as soon as they have seen enough.
+    """
+    current_file = ""
+
+    # Files to skip (contain regex patterns that look like secrets)
+    skip_files = {"secret_scan.py", "test_secrets.py"}
+
+    lines = diff.split('\n')
+    line_num = 0
+
+    for line in lines:
+        # Track current file
+        if line.startswith('+++ b/'):
+            current_file = line[6:].split('/')[-1]
+            continue
+
+        # Skip files that contain detection patterns
+        if current_file in skip_files:
+            continue
+        # Track line numbers from diff headers
+        if line.startswith('@@'):
+            # Parse @@ -x,y +a,b @@ format
+            m = HUNK_START_PATTERN.search(line)
+            if m:
+                line_num = int(m.group(1)) - 1
+            continue
+
+        # Only check added lines
+        if not line.startswith('+'):
+            if not line.startswith('-'):
+                line_num += 1
+            continue
+
+        line_num += 1
+        content = line[1:]  # Remove + prefix
+
+        # Skip diff metadata
+        if line.startswith('+++'):
+            continue
+
+        # Check known patterns
+        # Stripped line text is built once, on the line's first finding;
+        # it doubles as the "pattern matched on this line" flag
+        stripped = None
+        for pattern_name, pattern in candidate_patterns(content):
+            match_obj = pattern.search(content)
+            if not match_obj:
+                continue
+            if stripped is None:
+                stripped = content.strip()
+            yield SecretMatch(
+                line_num=line_num,
+                line=stripped,
+                pattern_name=pattern_name,
+                match=shorten(match_obj.group(0))
+            )
+
+        # Check entropy (only if no pattern match found for this line)
+        if stripped is None:
+            for value, entropy in check_high_entropy(content):
+                if stripped is None:
+                    stripped = content.strip()
+                yield SecretMatch(
+                    line_num=line_num,
+                    line=stripped,
+                    pattern_name=f"High entropy ({entropy:.1f})",
+                    match=shorten(value)
+                )
+
+
+def format_warning(matches: List[SecretMatch]) -> str:
+    """Format secret matches as a warning message."""
+    if not matches:
+        return ""
+
+    lines = ["", "WARNING: Potential secrets detected!", "-" * 40]
+
+    for m in matches:
+        lines.append(f"  Line {m.line_num}: {m.pattern_name}")
+        lines.append(f"    {m.line[:60]}{'...' if len(m.line) > 60 else ''}")
+
+    lines.append("-" * 40)
+    lines.append("")
+
+    return "\n".join(lines)
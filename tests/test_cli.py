@@ -2,14 +2,15 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
-import tempfile
-import shutil
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from typer.testing import CliRunner
-from main import app
+from main import (
+    app, clean_response, strip_signatures, call_local_fallback, read_review_choice,
+    MAX_HEADER_SCAN_LINES, REVIEW_ACTIONS,
+)
 
 runner = CliRunner()
 
@@ -17,15 +18,6 @@ runner = CliRunner()
 class TestUseCommand(unittest.TestCase):
     """Tests for 'sensei use' command."""
 
-    def setUp(self):
-        """Create a temporary directory for test config files."""
-        self.test_dir = tempfile.mkdtemp()
-        self.config_path = os.path.join(self.test_dir, ".sensei.toml")
-
-    def tearDown(self):
-        """Remove temporary directory."""
-        shutil.rmtree(self.test_dir)
-
     @patch("main.config_mgr")
     def test_use_valid_provider(self, mock_config):
         """'sensei use claude' should set claude as default."""
@@ -259,5 +251,211 @@ class TestCheckCommand(unittest.TestCase):
         self.assertIn("Provider 'unknown' not found", result.stdout)
 
 
+class TestCommitCommand(unittest.TestCase):
+    """Tests for 'sensei commit' command."""
+
+    DIFF = b"diff --git a/main.py b/main.py\n+print('hi')\n"
+
+    def setUp(self):
+        patches = {
+            "config": patch("main.config_mgr"),
+            "provider": patch("main.AIProvider"),
+            "diff": patch("main.get_staged_diff", return_value=self.DIFF),
+            "context": patch("main.get_git_context", return_value={}),
+            "commit": patch("main.create_commit", return_value=True),
+            "which": patch("main.which", return_value="/usr/bin/git"),
+        }
+        self.mocks = {name: p.start() for name, p in patches.items()}
+        for p in patches.values():
+            self.addCleanup(p.stop)
+
+        self.mocks["config"].get_default_provider.return_value = "gemini"
+        self.mocks["config"].get_provider_config.return_value = {"command": "gemini"}
+        self.mocks["config"].get_universal_prompt.return_value = "PROMPT {context}{issue_footer}"
+        self.mocks["config"].get_compact_diff.return_value = False
+        self.mocks["config"].get_fast_path.return_value = True
+        self.ai = MagicMock()
+        self.ai.execute.return_value = "feat(main): print greeting"
+        self.mocks["provider"].return_value = self.ai
+
+    def test_dry_run(self):
+        result = runner.invoke(app, ["commit", "--dry-run"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("feat(main): print greeting", result.stdout)
+        self.mocks["commit"].assert_not_called()
+
+    def test_accept_commits(self):
+        result = runner.invoke(app, ["commit"], input="y\n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Committed!", result.stdout)
+        self.mocks["commit"].assert_called_once_with("feat(main): print greeting")
+
+    def test_abort(self):
+        result = runner.invoke(app, ["commit"], input="no\n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Aborted.", result.stdout)
+        self.mocks["commit"].assert_not_called()
+
+    def test_retry_then_accept(self):
+        self.ai.execute.side_effect = ["feat: first", "fix: second"]
+
+        result = runner.invoke(app, ["commit"], input="r\ny\n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.mocks["commit"].assert_called_once_with("fix: second")
+        first, retry = self.ai.execute.call_args_list
+        self.assertTrue(first.kwargs.get("use_cache"))
+        self.assertFalse(retry.kwargs.get("use_cache"))
+
+    def test_compact_diff_sent_to_provider(self):
+        self.mocks["config"].get_compact_diff.return_value = True
+        self.mocks["diff"].return_value = (
+            b"diff --git a/main.py b/main.py\nindex 1..2 100644\n@@ -1,2 +1,2 @@\n"
+            b" import os\n+print('hi')\n"
+        )
+
+        result = runner.invoke(app, ["commit", "--dry-run"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(
+            self.ai.execute.call_args[0][0],
+            b"diff --git a/main.py b/main.py\n@@ -1,2 +1,2 @@\n+print('hi')\n"
+        )
+
+    def test_trivial_change_skips_ai(self):
+        self.mocks["diff"].return_value = (
+            b"diff --git a/setup.py b/setup.py\n@@ -1 +1 @@\n"
+            b"-    version=\"0.10.0\",\n+    version=\"0.11.0\",\n"
+        )
+
+        result = runner.invoke(app, ["commit"], input="y\n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.ai.execute.assert_not_called()
+        self.mocks["commit"].assert_called_once_with("chore(setup): bump version to 0.11.0")
+
+    def test_fast_path_without_local_bridge(self):
+        self.mocks["diff"].return_value = (
+            b"diff --git a/setup.py b/setup.py\n@@ -1 +1 @@\n"
+            b"-    version=\"0.10.0\",\n+    version=\"0.11.0\",\n"
+        )
+
+        with patch.dict(sys.modules, {"local_bridge": None}):
+            result = runner.invoke(app, ["commit"], input="y\n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.ai.execute.assert_called_once()
+
+    def test_fast_path_disabled(self):
+        self.mocks["config"].get_fast_path.return_value = False
+        self.mocks["diff"].return_value = (
+            b"diff --git a/setup.py b/setup.py\n@@ -1 +1 @@\n"
+            b"-    version=\"0.10.0\",\n+    version=\"0.11.0\",\n"
+        )
+
+        result = runner.invoke(app, ["commit"], input="y\n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.ai.execute.assert_called_once()
+        self.mocks["commit"].assert_called_once_with("feat(main): print greeting")
+
+    def test_no_staged_changes(self):
+        self.mocks["diff"].return_value = None
+
+        result = runner.invoke(app, ["commit"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("No staged changes.", result.stdout)
+        self.ai.execute.assert_not_called()
+
+
+class TestReadReviewChoice(unittest.TestCase):
+    """Tests for read_review_choice."""
+
+    @patch("main.typer.echo")
+    @patch("main.typer.getchar", return_value="R")
+    @patch("main.sys.stdin")
+    def test_single_key_on_terminal(self, mock_stdin, mock_getchar, mock_echo):
+        mock_stdin.isatty.return_value = True
+        self.assertEqual(read_review_choice(), "r")
+        mock_getchar.assert_called_once()
+
+    @patch("main.typer.echo")
+    @patch("main.typer.getchar", return_value="\r")
+    @patch("main.sys.stdin")
+    def test_enter_means_default(self, mock_stdin, mock_getchar, mock_echo):
+        mock_stdin.isatty.return_value = True
+        self.assertEqual(read_review_choice(), "y")
+
+    @patch("main.typer.echo")
+    @patch("main.sys.stdin")
+    def test_space_or_tab_is_not_accept(self, mock_stdin, mock_echo):
+        mock_stdin.isatty.return_value = True
+        for key in (" ", "\t"):
+            with patch("main.typer.getchar", return_value=key):
+                self.assertIsNone(REVIEW_ACTIONS.get(read_review_choice()))
+
+    @patch("main.typer.prompt", return_value="Yes")
+    @patch("main.sys.stdin")
+    def test_line_prompt_when_not_a_terminal(self, mock_stdin, mock_prompt):
+        mock_stdin.isatty.return_value = False
+        self.assertEqual(read_review_choice(), "yes")
+
+
+class TestCleanResponse(unittest.TestCase):
+    """Tests for clean_response and strip_signatures helpers."""
+
+    def test_skips_preamble(self):
+        raw = "Here's the commit message:\n\nfeat(cli): add retry option\n\nBody text."
+        self.assertEqual(clean_response(raw), "feat(cli): add retry option\n\nBody text.")
+
+    def test_type_prefix_without_valid_format(self):
+        raw = "fixing things now\nfix(core): real message"
+        self.assertEqual(clean_response(raw), "fix(core): real message")
+
+    def test_no_conventional_line(self):
+        self.assertEqual(clean_response("  update stuff  "), "update stuff")
+
+    def test_header_on_last_line(self):
+        self.assertEqual(clean_response("Sure!\nchore: tidy up"), "chore: tidy up")
+
+    def test_header_beyond_scan_window_is_ignored(self):
+        raw = "filler\n" * MAX_HEADER_SCAN_LINES + "feat: late header"
+        self.assertEqual(clean_response(raw), raw.strip())
+
+    def test_strips_signatures(self):
+        raw = "fix: handle empty diff\n\nCo-Authored-By: Bot <bot@example.com>"
+        self.assertEqual(clean_response(raw), "fix: handle empty diff")
+
+    def test_strip_generated_footer(self):
+        message = "docs: update readme\n\n🤖 Generated with some tool"
+        self.assertEqual(strip_signatures(message), "docs: update readme")
+
+
+class TestLocalFallback(unittest.TestCase):
+    """Tests for call_local_fallback."""
+
+    @patch("main.subprocess.run")
+    def test_runs_in_process(self, mock_run):
+        diff = "diff --git a/main.py b/main.py\n+x = 1\n"
+        self.assertEqual(call_local_fallback(diff), "feat(main): implement logic in main.py")
+        mock_run.assert_not_called()
+
+    def test_subprocess_when_import_fails(self):
+        diff = b"diff --git a/main.py b/main.py\n+x = 1\n"
+        with patch.dict(sys.modules, {"local_bridge": None}):
+            self.assertEqual(call_local_fallback(diff), "feat(main): implement logic in main.py")
+
+    @patch("main.subprocess.run")
+    def test_missing_script_placeholder(self, mock_run):
+        with patch.dict(sys.modules, {"local_bridge": None}), \
+                patch("main.LOCAL_BRIDGE_EXISTS", False):
+            self.assertEqual(call_local_fallback(b"diff"), "chore: update files")
+        mock_run.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
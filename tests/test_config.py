@@ -8,7 +8,8 @@ import shutil
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import ConfigManager
+import config
+from config import ConfigManager, get_config_manager
 
 
 class TestConfigManager(unittest.TestCase):
@@ -21,6 +22,22 @@ class TestConfigManager(unittest.TestCase):
             cm.config = {"core": {"default_provider": "gemini"}, "providers": {}}
             self.assertEqual(cm.get_default_provider(), "gemini")
 
+    def test_compact_diff_defaults_off(self):
+        """compact_diff is opt-in via [core] compact_diff = true."""
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+            self.assertFalse(cm.get_compact_diff())
+            cm.config["core"]["compact_diff"] = True
+            self.assertTrue(cm.get_compact_diff())
+
+    def test_fast_path_defaults_on(self):
+        """fast_path can be switched off via [core] fast_path = false."""
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+            self.assertTrue(cm.get_fast_path())
+            cm.config["core"]["fast_path"] = False
+            self.assertFalse(cm.get_fast_path())
+
     def test_list_providers(self):
         """list_providers should return dict of name -> description."""
         with patch.object(ConfigManager, 'load_config'):
@@ -52,6 +69,96 @@ class TestConfigManager(unittest.TestCase):
             cfg_none = cm.get_provider_config("nonexistent")
             self.assertIsNone(cfg_none)
 
+    def test_merge_config_is_deep(self):
+        """_merge_config should merge nested provider tables key by key."""
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+            cm.config = {
+                "core": {"default_provider": "gemini"},
+                "providers": {
+                    "gemini": {"description": "Google Gemini", "command": "gemini"},
+                }
+            }
+            cm._merge_config({
+                "providers": {
+                    "gemini": {"command": "gemini --model pro"},
+                    "claude": {"description": "Claude", "command": "claude"},
+                },
+                "extra": {"key": "value"},
+            })
+            self.assertEqual(cm.config["providers"]["gemini"], {
+                "description": "Google Gemini",
+                "command": "gemini --model pro",
+            })
+            self.assertIn("claude", cm.config["providers"])
+            self.assertEqual(cm.config["extra"], {"key": "value"})
+            self.assertEqual(cm.get_default_provider(), "gemini")
+
+    def test_get_config_manager_is_shared(self):
+        """get_config_manager should load config once and reuse the instance."""
+        get_config_manager.cache_clear()
+        try:
+            with patch.object(ConfigManager, 'load_config') as mock_load:
+                first = get_config_manager()
+                second = get_config_manager()
+            self.assertIs(first, second)
+            mock_load.assert_called_once()
+        finally:
+            get_config_manager.cache_clear()
+
+
+class TestLoadConfig(unittest.TestCase):
+    """Tests for ConfigManager.load_config method."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_missing_files_are_skipped(self):
+        """load_config should keep defaults when no config files exist."""
+        missing = os.path.join(self.test_dir, "missing")
+        with patch("os.getcwd", return_value=missing), \
+             patch("os.path.expanduser", return_value=os.path.join(missing, ".sensei.toml")), \
+             patch("config.os.path.dirname", return_value=missing):
+            cm = ConfigManager()
+        self.assertEqual(cm.get_default_provider(), "gemini")
+
+    @unittest.skipIf(config.toml_load is None, "no TOML parser (tomli is not installed)")
+    def test_project_config_is_loaded(self):
+        """load_config should merge a project-level .sensei.toml."""
+        with open(os.path.join(self.test_dir, ".sensei.toml"), "w") as f:
+            f.write('[providers.custom]\ndescription = "Custom"\ncommand = "custom"\n')
+        missing = os.path.join(self.test_dir, "missing")
+        with patch("os.getcwd", return_value=self.test_dir), \
+             patch("os.path.expanduser", return_value=os.path.join(missing, ".sensei.toml")), \
+             patch("config.os.path.dirname", return_value=missing):
+            cm = ConfigManager()
+        self.assertEqual(cm.get_provider_config("custom")["command"], "custom")
+
+    def test_defaults_are_not_mutated(self):
+        """Merging config into one instance should not leak into DEFAULT_CONFIG."""
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+        cm._merge_config({"providers": {"gemini": {"command": "changed"}}})
+        self.assertNotEqual(config.DEFAULT_CONFIG["providers"]["gemini"]["command"], "changed")
+        with patch.object(ConfigManager, 'load_config'):
+            self.assertNotEqual(ConfigManager().get_provider_config("gemini")["command"], "changed")
+
+    @unittest.skipIf(config.toml_load is None, "no TOML parser (tomli is not installed)")
+    def test_invalid_file_warns(self):
+        """load_config should warn and continue on a broken config file."""
+        with open(os.path.join(self.test_dir, ".sensei.toml"), "w") as f:
+            f.write("this is not = = toml")
+        missing = os.path.join(self.test_dir, "missing")
+        with patch("os.getcwd", return_value=self.test_dir), \
+             patch("os.path.expanduser", return_value=os.path.join(missing, ".sensei.toml")), \
+             patch("config.os.path.dirname", return_value=missing), \
+             patch("builtins.print") as mock_print:
+            ConfigManager()
+        self.assertIn("Warning: Failed to parse", mock_print.call_args[0][0])
+
 
 class TestSetDefaultProvider(unittest.TestCase):
     """Tests for ConfigManager.set_default_provider method."""
@@ -106,6 +213,43 @@ class TestSetDefaultProvider(unittest.TestCase):
                 content = f.read()
             self.assertIn('default_provider = "claude"', content)
             self.assertNotIn('default_provider = "gemini"', content)
+            self.assertEqual(os.listdir(self.test_dir), [".sensei.toml"])
+
+    def _manager(self):
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+        cm.config = {
+            "core": {"default_provider": "gemini"},
+            "providers": {"claude": {"description": "Claude"}}
+        }
+        return cm
+
+    @unittest.skipIf(os.name == "nt", "symlinks need extra privileges on Windows")
+    def test_set_default_provider_keeps_symlink_and_mode(self):
+        """set_default_provider should write through a symlink and keep the file mode."""
+        real_path = os.path.join(self.test_dir, "dotfiles.toml")
+        with open(real_path, "w") as f:
+            f.write('[core]\ndefault_provider = "gemini"\n')
+        os.chmod(real_path, 0o600)
+        os.symlink(real_path, self.config_path)
+
+        cm = self._manager()
+        with patch.object(cm, 'get_config_path', return_value=self.config_path):
+            self.assertTrue(cm.set_default_provider("claude"))
+
+        self.assertTrue(os.path.islink(self.config_path))
+        with open(real_path, "r") as f:
+            self.assertIn('default_provider = "claude"', f.read())
+        self.assertEqual(os.stat(real_path).st_mode & 0o777, 0o600)
+
+    def test_set_default_provider_failed_write_removes_tmp(self):
+        """A failed rename should not leave the .tmp file behind."""
+        cm = self._manager()
+        with patch.object(cm, 'get_config_path', return_value=self.config_path), \
+                patch("config.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                cm.set_default_provider("claude")
+        self.assertEqual(os.listdir(self.test_dir), [])
 
     def test_set_default_provider_invalid_provider(self):
         """set_default_provider should return False for unknown provider."""
@@ -133,6 +277,28 @@ class TestSetDefaultProvider(unittest.TestCase):
 
             self.assertEqual(cm.get_default_provider(), "claude")
 
+    def test_update_adds_key_under_core_without_tomlkit(self):
+        """Regex fallback should add default_provider under existing [core]."""
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+        with patch.object(config, 'load_tomlkit', return_value=None):
+            content = cm._update_default_provider('[core]\nother = 1\n', "claude")
+        self.assertEqual(content, '[core]\ndefault_provider = "claude"\nother = 1\n')
+
+    @unittest.skipIf(config.load_tomlkit() is None, "tomlkit not installed")
+    def test_update_ignores_key_inside_strings(self):
+        """Structured update should not touch default_provider inside a string value."""
+        original = (
+            '# user config\n'
+            '[prompts]\n'
+            'universal = """\ndefault_provider = "x"\n"""\n'
+        )
+        with patch.object(ConfigManager, 'load_config'):
+            cm = ConfigManager()
+        content = cm._update_default_provider(original, "claude")
+        self.assertTrue(content.startswith(original))
+        self.assertIn('[core]\ndefault_provider = "claude"', content)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,247 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_bridge import (
+    parse_diff, determine_type, generate_message, generate, split_extension, fast_classify
+)
+
+
+class TestParseDiff(unittest.TestCase):
+    """Tests for parse_diff function."""
+
+    def test_collects_files(self):
+        diff = """diff --git a/main.py b/main.py
++print("hello")
+diff --git a/docs/README.md b/docs/README.md
++text
+"""
+        files, _, _ = parse_diff(diff)
+        self.assertEqual(files, ["main.py", "docs/README.md"])
+
+    def test_fix_keywords(self):
+        diff = """diff --git a/main.py b/main.py
++# Handle ERROR case
+"""
+        _, is_fix, is_test = parse_diff(diff)
+        self.assertTrue(is_fix)
+        self.assertFalse(is_test)
+
+    def test_test_keyword(self):
+        diff = """diff --git a/main.py b/main.py
++def test_login():
+"""
+        _, is_fix, is_test = parse_diff(diff)
+        self.assertFalse(is_fix)
+        self.assertTrue(is_test)
+
+    def test_both_keywords_in_one_line(self):
+        diff = """diff --git a/main.py b/main.py
++def test_bug_fix():
+"""
+        _, is_fix, is_test = parse_diff(diff)
+        self.assertTrue(is_fix)
+        self.assertTrue(is_test)
+
+    def test_ignores_removed_lines(self):
+        diff = """diff --git a/main.py b/main.py
+--- a/main.py
++++ b/main.py
+-# fix bug
+"""
+        _, is_fix, is_test = parse_diff(diff)
+        self.assertFalse(is_fix)
+        self.assertFalse(is_test)
+
+    def test_files_after_both_flags_set(self):
+        diff = """diff --git a/main.py b/main.py
++def test_bug():
+diff --git a/config.py b/config.py
++x = 1
+"""
+        files, is_fix, is_test = parse_diff(diff)
+        self.assertEqual(files, ["main.py", "config.py"])
+        self.assertTrue(is_fix)
+        self.assertTrue(is_test)
+
+    def test_accepts_bytes(self):
+        diff = "diff --git a/zażółć.py b/zażółć.py\n+# fix\n".encode("utf-8")
+        files, is_fix, _ = parse_diff(diff)
+        self.assertEqual(files, ["zażółć.py"])
+        self.assertTrue(is_fix)
+
+
+class TestSplitExtension(unittest.TestCase):
+    """Tests for split_extension function."""
+
+    def test_simple(self):
+        self.assertEqual(split_extension("src/main.py"), ("main", ".py"))
+
+    def test_multiple_dots(self):
+        self.assertEqual(split_extension("archive.tar.gz"), ("archive.tar", ".gz"))
+
+    def test_dotfile(self):
+        self.assertEqual(split_extension("dir/.gitignore"), (".gitignore", ""))
+
+    def test_no_extension(self):
+        self.assertEqual(split_extension("pkg.d/Dockerfile"), ("Dockerfile", ""))
+
+
+class TestDetermineType(unittest.TestCase):
+    """Tests for determine_type function."""
+
+    def test_no_files(self):
+        self.assertEqual(determine_type([], False), "chore")
+
+    def test_fix_content(self):
+        self.assertEqual(determine_type(["main.py"], True), "fix")
+
+    def test_docs(self):
+        self.assertEqual(determine_type(["README.md"], False), "docs")
+
+    def test_style(self):
+        self.assertEqual(determine_type(["app.css"], False), "style")
+
+    def test_test_file(self):
+        self.assertEqual(determine_type(["tests/test_x.py"], False), "test")
+
+    def test_chore_file(self):
+        self.assertEqual(determine_type(["Dockerfile"], False), "chore")
+        self.assertEqual(determine_type([".gitignore"], False), "chore")
+
+    def test_source_file(self):
+        self.assertEqual(determine_type(["main.py"], False), "feat")
+
+    def test_priority_independent_of_file_order(self):
+        self.assertEqual(determine_type(["main.py", "README.md"], False), "docs")
+        self.assertEqual(determine_type(["tests/test_x.py", "app.css"], False), "style")
+        self.assertEqual(determine_type(["main.py", "Dockerfile"], False), "chore")
+
+
+class TestGenerateMessage(unittest.TestCase):
+    """Tests for generate_message function."""
+
+    def test_empty_diff(self):
+        self.assertEqual(generate_message(""), "chore: minor update")
+
+    def test_single_file(self):
+        diff = """diff --git a/main.py b/main.py
++print("hello")
+"""
+        self.assertEqual(generate_message(diff), "feat(main): implement logic in main.py")
+
+    def test_multiple_files(self):
+        diff = """diff --git a/main.py b/main.py
++print("hello")
+diff --git a/config.py b/config.py
++x = 1
+"""
+        self.assertEqual(
+            generate_message(diff),
+            "feat(main+): implement logic in main.py and 1 other files"
+        )
+
+
+class TestGenerate(unittest.TestCase):
+    """Tests for the generate entry point."""
+
+    def test_empty_input(self):
+        self.assertEqual(generate("  \n"), "chore: empty commit")
+        self.assertEqual(generate(b""), "chore: empty commit")
+
+    def test_bytes_input(self):
+        diff = b"diff --git a/main.py b/main.py\n+x = 1\n"
+        self.assertEqual(generate(diff), "feat(main): implement logic in main.py")
+
+    def test_errors_become_placeholder(self):
+        self.assertTrue(generate(None).startswith("chore: manual check required"))
+
+
+class TestFastClassify(unittest.TestCase):
+    """Tests for fast_classify function."""
+
+    def test_version_bump(self):
+        diff = """diff --git a/setup.py b/setup.py
+--- a/setup.py
++++ b/setup.py
+@@ -3,1 +3,1 @@
+-    version="0.10.0",
++    version="0.11.0",
+"""
+        self.assertEqual(fast_classify(diff), "chore(setup): bump version to 0.11.0")
+
+    def test_dunder_version_bump(self):
+        diff = """diff --git a/pkg/__init__.py b/pkg/__init__.py
+@@ -1 +1 @@
+-__version__ = '1.2.3'
++__version__ = '1.2.4'
+"""
+        self.assertEqual(fast_classify(diff), "chore(__init__): bump version to 1.2.4")
+
+    def test_whitespace_only(self):
+        diff = (
+            "diff --git a/main.py b/main.py\n--- a/main.py\n+++ b/main.py\n"
+            "@@ -1,2 +1,3 @@\n-def f(a,  b):   \n+def f(a, b):\n+\n"
+        )
+        self.assertEqual(fast_classify(diff), "style(main): fix whitespace")
+
+    def test_joined_tokens_are_content(self):
+        for old, new in (('print("hello world")', 'print("helloworld")'), ("a - -b", "a --b")):
+            diff = f"diff --git a/app.js b/app.js\n@@ -1 +1 @@\n-{old}\n+{new}\n"
+            self.assertIsNone(fast_classify(diff))
+
+    def test_reindent_in_python_is_content(self):
+        diff = """diff --git a/main.py b/main.py
+@@ -1,2 +1,2 @@
+ if dry_run:
+-    delete_all()
++delete_all()
+"""
+        self.assertIsNone(fast_classify(diff))
+
+    def test_makefile_tabs_to_spaces_is_content(self):
+        diff = "diff --git a/Makefile b/Makefile\n@@ -1 +1 @@\n-\tpytest\n+    pytest\n"
+        self.assertIsNone(fast_classify(diff))
+
+    def test_reindent_elsewhere_is_whitespace(self):
+        diff = "diff --git a/app.js b/app.js\n@@ -1 +1 @@\n-\treturn 1;\n+    return 1;\n"
+        self.assertEqual(fast_classify(diff), "style(app): fix whitespace")
+
+    def test_removed_comment_lines_are_content(self):
+        diff = """diff --git a/schema.sql b/schema.sql
+@@ -1,2 +1,1 @@
+--- drop this comment
+-SELECT 1;
++SELECT 1;
+"""
+        self.assertIsNone(fast_classify(diff))
+
+    def test_real_change(self):
+        diff = """diff --git a/main.py b/main.py
+@@ -1 +1 @@
+-x = 1
++x = 2
+"""
+        self.assertIsNone(fast_classify(diff))
+
+    def test_multiple_files(self):
+        diff = """diff --git a/a.py b/a.py
+@@ -1 +1 @@
+-version = "1"
++version = "2"
+diff --git a/b.py b/b.py
+@@ -1 +1 @@
+-x=1
++x = 1
+"""
+        self.assertIsNone(fast_classify(diff))
+
+    def test_large_diff_skipped(self):
+        diff = "diff --git a/a.py b/a.py\n@@ -1 +1 @@\n" + "+ \n" * 5000
+        self.assertIsNone(fast_classify(diff))
+
+
+if __name__ == "__main__":
+    unittest.main()
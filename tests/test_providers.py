@@ -0,0 +1,218 @@
+import unittest
+from unittest.mock import patch
+import shlex
+import shutil
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers import (
+    AIProvider, which, write_prompt_file, read_cached_response, write_cached_response,
+    RESPONSE_CACHE_TTL,
+)
+
+# Small Python one-liners used as stand-in provider CLIs.
+# -X utf8 keeps the child's stdio UTF-8 regardless of the Windows code page
+PYTHON = f'"{sys.executable}" -X utf8 -c'
+UPPER_CMD = f'{PYTHON} "import sys; sys.stdout.write(sys.stdin.read().upper())"'
+ARGV_CMD = f'{PYTHON} "import sys; sys.stdout.write(sys.argv[1])" "{{system}}"'
+FILE_CMD = f'{PYTHON} "import sys; sys.stdout.write(open(sys.argv[1]).read())" "{{system_file}}"'
+CRLF_CMD = f'{PYTHON} "import sys; sys.stdout.buffer.write(b\'feat: a\\r\\n\\r\\nbody\\r\\n\')"'
+SLEEP_CMD = f'{PYTHON} "import time; time.sleep(30)"'
+FAIL_CMD = f'{PYTHON} "import sys; sys.stderr.write(\'boom\'); sys.exit(3)"'
+
+
+class TestExecute(unittest.TestCase):
+    """Tests for AIProvider.execute."""
+
+    def test_pipes_diff_to_stdin(self):
+        ai = AIProvider("upper", {"command": UPPER_CMD})
+        self.assertEqual(ai.execute("diff text\n", "prompt"), "DIFF TEXT")
+
+    def test_accepts_bytes_diff(self):
+        ai = AIProvider("upper", {"command": UPPER_CMD})
+        self.assertEqual(ai.execute("zażółć\n".encode("utf-8"), "prompt"), "ZAŻÓŁĆ")
+
+    def test_substitutes_system_prompt(self):
+        ai = AIProvider("argv", {"command": ARGV_CMD})
+        self.assertEqual(ai.execute("", "be brief"), "be brief")
+
+    def test_prompt_via_file(self):
+        ai = AIProvider("file", {"command": FILE_CMD})
+        with patch("providers.write_prompt_file", wraps=write_prompt_file) as mock_write:
+            self.assertEqual(ai.execute("", 'say "hi"\nthen stop'), 'say "hi"\nthen stop')
+            ai.execute("", 'say "hi"\nthen stop')
+        mock_write.assert_called_once()
+
+    def test_prompt_with_quotes_stays_one_argument(self):
+        ai = AIProvider("argv", {"command": ARGV_CMD})
+        prompt = 'Say "hi" and don\'t stop\nline two'
+        self.assertEqual(ai.execute("", prompt), prompt)
+
+    def test_template_lexed_once(self):
+        ai = AIProvider("argv", {"command": ARGV_CMD})
+        with patch("providers.shlex.split", wraps=shlex.split) as mock_split:
+            self.assertEqual(ai.execute("", "be brief"), "be brief")
+            self.assertEqual(ai.execute("", "be brief"), "be brief")
+            self.assertEqual(ai.execute("", "other"), "other")
+        self.assertEqual(mock_split.call_count, 1)
+
+    def test_crlf_output_normalised(self):
+        ai = AIProvider("crlf", {"command": CRLF_CMD})
+        self.assertEqual(ai.execute("", "prompt"), "feat: a\n\nbody")
+
+    def test_large_diff_roundtrip(self):
+        ai = AIProvider("upper", {"command": UPPER_CMD})
+        diff = "+line of text\n" * 50000
+        self.assertEqual(ai.execute(diff, "prompt"), diff.upper().strip())
+
+    @patch("builtins.print")
+    def test_nonzero_exit_returns_empty(self, mock_print):
+        ai = AIProvider("fail", {"command": FAIL_CMD})
+        self.assertEqual(ai.execute("diff", "prompt"), "")
+        printed = " ".join(str(call.args[0]) for call in mock_print.call_args_list)
+        self.assertIn("Exit Code 3", printed)
+        self.assertIn("boom", printed)
+
+    @patch("builtins.print")
+    def test_hung_provider_times_out(self, mock_print):
+        ai = AIProvider("sleep", {"command": SLEEP_CMD})
+        with patch("providers.PROVIDER_TIMEOUT", 0.5):
+            self.assertEqual(ai.execute("diff", "prompt"), "")
+        printed = " ".join(str(call.args[0]) for call in mock_print.call_args_list)
+        self.assertIn("[Provider Error] sleep failed", printed)
+
+    @patch("builtins.print")
+    def test_missing_command_returns_empty(self, mock_print):
+        ai = AIProvider("missing", {"command": "sensei-no-such-binary {system}"})
+        self.assertEqual(ai.execute("diff", "prompt"), "")
+
+    def test_no_command_raises(self):
+        ai = AIProvider("empty", {})
+        with self.assertRaises(ValueError):
+            ai.execute("diff", "prompt")
+
+
+class TestResponseCache(unittest.TestCase):
+    """Tests for the on-disk response cache used by execute(use_cache=True)."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        patcher = patch("providers.RESPONSE_CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ai = AIProvider("upper", {"command": UPPER_CMD})
+
+    def test_second_call_served_from_cache(self):
+        self.assertEqual(self.ai.execute(b"diff", "prompt", use_cache=True), "DIFF")
+        with patch("providers.subprocess.run") as mock_run:
+            self.assertEqual(self.ai.execute(b"diff", "prompt", use_cache=True), "DIFF")
+        mock_run.assert_not_called()
+
+    def test_key_covers_prompt_and_diff(self):
+        base = self.ai.cache_path(b"diff", "prompt")
+        self.assertNotEqual(base, self.ai.cache_path(b"diff", "other"))
+        self.assertNotEqual(base, self.ai.cache_path(b"diff2", "prompt"))
+
+    def test_expired_entry_ignored(self):
+        path = self.ai.cache_path(b"diff", "prompt")
+        write_cached_response(path, "stale")
+        old = time.time() - RESPONSE_CACHE_TTL - 10
+        os.utime(path, (old, old))
+        self.assertEqual(self.ai.execute(b"diff", "prompt", use_cache=True), "DIFF")
+
+    def test_expired_entry_deleted_on_read(self):
+        path = self.ai.cache_path(b"diff", "prompt")
+        write_cached_response(path, "stale")
+        old = time.time() - RESPONSE_CACHE_TTL - 10
+        os.utime(path, (old, old))
+        self.assertIsNone(read_cached_response(path))
+        self.assertFalse(os.path.exists(path))
+
+    def test_write_prunes_expired_entries(self):
+        stale = self.ai.cache_path(b"old diff", "prompt")
+        write_cached_response(stale, "stale")
+        old = time.time() - RESPONSE_CACHE_TTL - 10
+        os.utime(stale, (old, old))
+        fresh = self.ai.cache_path(b"diff", "prompt")
+        write_cached_response(fresh, "fresh")
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(fresh)])
+
+    def test_without_cache_flag_nothing_written(self):
+        self.ai.execute(b"diff", "prompt")
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class TestBuildArgs(unittest.TestCase):
+    """Tests for AIProvider.build_args."""
+
+    def test_posix_splits_command(self):
+        ai = AIProvider("gemini", {"command": 'gemini "{system}"'})
+        with patch("providers.sys.platform", "linux"):
+            self.assertEqual(ai.build_args("be brief"), ["gemini", "be brief"])
+
+    def test_windows_resolved_exe_skips_shell(self):
+        ai = AIProvider("ollama", {"command": 'ollama run llama3 "{system}"'})
+        with patch("providers.sys.platform", "win32"), \
+                patch("providers.which", return_value=r"C:\Tools\ollama.EXE"):
+            self.assertEqual(
+                ai.build_args("be brief"),
+                [r"C:\Tools\ollama.EXE", "run", "llama3", "be brief"]
+            )
+
+    def test_windows_keeps_backslashes_in_arguments(self):
+        ai = AIProvider("ollama", {"command": r'ollama --config C:\cfg\x.json "{system}"'})
+        with patch("providers.sys.platform", "win32"), \
+                patch("providers.which", return_value=r"C:\Tools\ollama.EXE"):
+            self.assertEqual(
+                ai.build_args("be brief"),
+                [r"C:\Tools\ollama.EXE", "--config", r"C:\cfg\x.json", "be brief"]
+            )
+
+    def test_windows_cmd_shim_uses_shell(self):
+        ai = AIProvider("gemini", {"command": 'gemini "{system}"'})
+        with patch("providers.sys.platform", "win32"), \
+                patch("providers.which", return_value=r"C:\npm\gemini.CMD"):
+            self.assertEqual(ai.build_args("be brief"), 'gemini "be brief"')
+
+
+class TestCheckHealth(unittest.TestCase):
+    """Tests for AIProvider.check_health."""
+
+    def test_existing_executable(self):
+        ai = AIProvider("py", {"command": UPPER_CMD})
+        self.assertTrue(ai.check_health())
+
+    def test_missing_executable(self):
+        ai = AIProvider("missing", {"command": "sensei-no-such-binary {system}"})
+        self.assertFalse(ai.check_health())
+
+    def test_no_command(self):
+        self.assertFalse(AIProvider("empty", {}).check_health())
+
+    def test_executable_parsed_once(self):
+        ai = AIProvider("py", {"command": UPPER_CMD})
+        with patch("providers.shlex.split", wraps=shlex.split) as mock_split:
+            self.assertTrue(ai.check_health())
+            self.assertTrue(ai.check_health())
+        self.assertEqual(mock_split.call_count, 1)
+        self.assertEqual(ai.executable, sys.executable)
+
+    def test_which_is_memoized(self):
+        which.cache_clear()
+        try:
+            with patch("providers.shutil.which", return_value="/usr/bin/gemini") as mock_which:
+                ai = AIProvider("gemini", {"command": "gemini \"{system}\""})
+                self.assertTrue(ai.check_health())
+                self.assertTrue(ai.check_health())
+            mock_which.assert_called_once_with("gemini")
+        finally:
+            which.cache_clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 import unittest
+from unittest.mock import patch, MagicMock
 import sys
 import os
+import tempfile
+import shutil
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from git_utils import extract_issue_id, extract_branch_type
+from git_utils import (
+    extract_issue_id, extract_branch_type, get_git_context, clear_git_cache,
+    get_staged_diff, find_git_dir, get_context_cache_key, get_current_branch, compact_diff,
+)
 
 
 class TestExtractBranchType(unittest.TestCase):
@@ -85,6 +91,14 @@ class TestExtractIssueId(unittest.TestCase):
     def test_multiple_ids_first(self):
         self.assertEqual(extract_issue_id("feature/PROJ-123-and-PROJ-456"), "PROJ-123")
 
+    def test_memoized(self):
+        extract_issue_id.cache_clear()
+        with patch("git_utils.ISSUE_PATTERNS", []):
+            self.assertIsNone(extract_issue_id("feature/PROJ-9-memo"))
+        self.assertIsNone(extract_issue_id("feature/PROJ-9-memo"))
+        extract_issue_id.cache_clear()
+        self.assertEqual(extract_issue_id("feature/PROJ-9-memo"), "PROJ-9")
+
     # New pattern: feature/1-description
     def test_feature_number_dash_description(self):
         self.assertEqual(extract_issue_id("feature/1-init-wizard"), "#1")
@@ -93,5 +107,226 @@ class TestExtractIssueId(unittest.TestCase):
         self.assertEqual(extract_issue_id("fix/42-login-bug"), "#42")
 
 
+class TestGetGitContext(unittest.TestCase):
+    """Tests for get_git_context function."""
+
+    def setUp(self):
+        clear_git_cache()
+        # Keep the persistent cache out of these tests
+        patcher = patch("git_utils.find_git_dir", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        clear_git_cache()
+
+    def _completed(self, stdout, returncode=0):
+        return MagicMock(stdout=stdout, returncode=returncode)
+
+    @patch("git_utils.subprocess.run")
+    def test_pushed_feature_branch(self, mock_run):
+        mock_run.side_effect = [
+            self._completed(
+                b" refs/heads/main\n"
+                b"*refs/heads/feature/PROJ-1-login\n"
+                b" refs/remotes/origin/feature/PROJ-1-login\n"
+            ),
+            self._completed(b"2\n"),
+        ]
+
+        ctx = get_git_context()
+
+        self.assertEqual(ctx['branch'], "feature/PROJ-1-login")
+        self.assertEqual(ctx['issue_id'], "PROJ-1")
+        self.assertTrue(ctx['is_pushed'])
+        self.assertEqual(ctx['commits_ahead'], 2)
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertIn("main..HEAD", mock_run.call_args[0][0][2])
+
+    @patch("git_utils.subprocess.run")
+    def test_new_branch_not_pushed(self, mock_run):
+        mock_run.side_effect = [
+            self._completed(b" refs/heads/master\n*refs/heads/fix/login\n"),
+            self._completed(b"1\n"),
+        ]
+
+        ctx = get_git_context()
+
+        self.assertFalse(ctx['is_pushed'])
+        self.assertIn("New branch (not yet pushed)", ctx['context_summary'])
+        self.assertIn("master..HEAD", mock_run.call_args[0][0][2])
+
+    @patch("git_utils.subprocess.run")
+    def test_main_branch_skips_rev_list(self, mock_run):
+        mock_run.return_value = self._completed(b"*refs/heads/main\n")
+
+        ctx = get_git_context()
+
+        self.assertEqual(ctx['commits_ahead'], 0)
+        self.assertEqual(ctx['context_summary'], "Direct commit to main branch")
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch("git_utils.subprocess.run")
+    def test_result_is_memoized(self, mock_run):
+        mock_run.return_value = self._completed(b"*refs/heads/main\n")
+
+        first = get_git_context()
+        second = get_git_context()
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_run.call_count, 1)
+
+
+class TestGitContextCache(unittest.TestCase):
+    """Tests for the persistent .git/sensei-cache.json context cache."""
+
+    def setUp(self):
+        clear_git_cache()
+        self.repo = tempfile.mkdtemp()
+        self.git_dir = os.path.join(self.repo, ".git")
+        os.makedirs(os.path.join(self.git_dir, "refs", "heads"))
+        with open(os.path.join(self.git_dir, "HEAD"), "w") as f:
+            f.write("ref: refs/heads/main\n")
+        self._write_ref("refs/heads/main", "a" * 40)
+
+    def tearDown(self):
+        clear_git_cache()
+        shutil.rmtree(self.repo)
+
+    def _write_ref(self, ref, sha):
+        path = os.path.join(self.git_dir, ref)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(sha + "\n")
+
+    def test_find_git_dir_from_subdirectory(self):
+        sub = os.path.join(self.repo, "src", "pkg")
+        os.makedirs(sub)
+        self.assertEqual(find_git_dir(sub), self.git_dir)
+
+    def test_find_git_dir_worktree_file(self):
+        worktree = os.path.join(self.repo, "wt")
+        os.makedirs(worktree)
+        with open(os.path.join(worktree, ".git"), "w") as f:
+            f.write("gitdir: ../.git/worktrees/wt\n")
+        self.assertEqual(
+            find_git_dir(worktree),
+            os.path.join(self.git_dir, "worktrees", "wt")
+        )
+
+    @patch("git_utils.subprocess.run")
+    def test_second_process_hits_cache(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=b"*refs/heads/main\n", returncode=0)
+
+        with patch("git_utils.find_git_dir", return_value=self.git_dir):
+            first = get_git_context()
+            clear_git_cache()  # Simulate a new process
+            second = get_git_context()
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_run.call_count, 1)
+
+    def test_key_changes_when_head_moves(self):
+        key = get_context_cache_key(self.git_dir)
+        self._write_ref("refs/heads/main", "b" * 40 + "\n")
+        self.assertNotEqual(get_context_cache_key(self.git_dir), key)
+
+    @patch("git_utils.subprocess.run")
+    def test_current_branch_from_head_file(self, mock_run):
+        with open(os.path.join(self.git_dir, "HEAD"), "w") as f:
+            f.write("ref: refs/heads/feature/PROJ-1\n")
+        with patch("git_utils.find_git_dir", return_value=self.git_dir):
+            self.assertEqual(get_current_branch(), "feature/PROJ-1")
+        mock_run.assert_not_called()
+
+    @patch("git_utils.subprocess.run")
+    def test_current_branch_asks_git_in_reftable_repo(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=b"feature/PROJ-2\n")
+        os.makedirs(os.path.join(self.git_dir, "reftable"))
+        with open(os.path.join(self.git_dir, "HEAD"), "w") as f:
+            f.write("ref: refs/heads/.invalid\n")
+        with patch("git_utils.find_git_dir", return_value=self.git_dir):
+            self.assertEqual(get_current_branch(), "feature/PROJ-2")
+
+    @patch("git_utils.subprocess.run")
+    def test_current_branch_detached_head(self, mock_run):
+        with open(os.path.join(self.git_dir, "HEAD"), "w") as f:
+            f.write("a" * 40 + "\n")
+        with patch("git_utils.find_git_dir", return_value=self.git_dir):
+            self.assertEqual(get_current_branch(), "")
+        mock_run.assert_not_called()
+
+    def test_no_key_for_linked_worktree(self):
+        with open(os.path.join(self.git_dir, "commondir"), "w") as f:
+            f.write("../..\n")
+        self.assertIsNone(get_context_cache_key(self.git_dir))
+
+    def test_no_key_for_reftable_repo(self):
+        os.makedirs(os.path.join(self.git_dir, "reftable"))
+        with open(os.path.join(self.git_dir, "HEAD"), "w") as f:
+            f.write("ref: refs/heads/.invalid\n")
+        self.assertIsNone(get_context_cache_key(self.git_dir))
+
+
+class TestGetStagedDiff(unittest.TestCase):
+    """Tests for get_staged_diff function."""
+
+    @patch("git_utils.subprocess.run")
+    def test_nothing_staged(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=b"", returncode=0)
+
+        self.assertIsNone(get_staged_diff())
+        mock_run.assert_called_once()
+
+    @patch("git_utils.subprocess.run")
+    def test_staged_changes(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=b"diff --git a/x b/x\n", returncode=1)
+
+        self.assertEqual(get_staged_diff(), b"diff --git a/x b/x\n")
+        mock_run.assert_called_once()
+
+
+class TestCompactDiff(unittest.TestCase):
+    """Tests for compact_diff function."""
+
+    def test_keeps_only_changes(self):
+        diff = (
+            b"diff --git a/main.py b/main.py\n"
+            b"index 1111111..2222222 100644\n"
+            b"--- a/main.py\n"
+            b"+++ b/main.py\n"
+            b"@@ -1,3 +1,3 @@\n"
+            b" import os\n"
+            b"-x = 1\n"
+            b"+x = 2\n"
+            b" print(x)\n"
+        )
+        self.assertEqual(
+            compact_diff(diff),
+            b"diff --git a/main.py b/main.py\n@@ -1,3 +1,3 @@\n-x = 1\n+x = 2\n"
+        )
+
+    def test_dash_lines_inside_hunk_are_kept(self):
+        diff = (
+            b"diff --git a/schema.sql b/schema.sql\n"
+            b"@@ -1 +1 @@\n"
+            b"--- old comment\n"
+            b"+++ new counter\n"
+        )
+        self.assertEqual(compact_diff(diff), diff)
+
+    def test_keeps_file_status_headers(self):
+        diff = (
+            b"diff --git a/old.py b/new.py\n"
+            b"similarity index 100%\n"
+            b"rename from old.py\n"
+            b"rename to new.py\n"
+        )
+        self.assertEqual(
+            compact_diff(diff),
+            b"diff --git a/old.py b/new.py\nrename from old.py\nrename to new.py\n"
+        )
+
+
 if __name__ == "__main__":
     unittest.main()